@@ -0,0 +1,52 @@
+"""Compare clean_text_for_speech with the old multi-pass version.
+
+Run from the repository root:
+
+    python benchmarks/bench_speech.py
+"""
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storygen.bulk import iter_stories
+from storygen.speech import clean_text_for_speech
+
+def legacy_clean_text_for_speech(text):
+    """The original implementation, kept here as the reference output"""
+    text = re.sub(r'[^\w\s.,!?;:\'-]', '', text)
+    text = re.sub(r'[=\-]{3,}', '', text)
+    text = re.sub(r'🎪.*?🎪|🤪.*?🤪|🌙.*?🌙|🕷️.*?🕷️|🚀.*?🚀|🛸.*?🛸|💖.*?💖|🌹.*?🌹', '', text)
+    text = re.sub(r'\n+', '. ', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'#\w+', '', text)
+    text = text.replace('WiFi', 'Wi-Fi')
+    text = text.replace('TikTok', 'Tick Tock')
+    text = text.replace('Netflix', 'Netflix')
+    return text.strip()
+
+def best_time(func, text, number):
+    """Best per-call time in microseconds over five repeats"""
+    return min(timeit.repeat(lambda: func(text), number=number, repeat=5)) / number * 1e6
+
+def main():
+    stories = [record["story"] for record in iter_stories(200, seed=1)]
+    inputs = {
+        "short story": (stories[0], 2000),
+        "long story (20 stories)": ("\n\n".join(stories[:20]), 100),
+        "very long story (200 stories)": ("\n\n".join(stories), 10),
+    }
+
+    for story in stories:
+        assert clean_text_for_speech(story) == legacy_clean_text_for_speech(story), "outputs differ"
+
+    print(f"{'input':<32}{'chars':>8}{'old (us)':>12}{'new (us)':>12}{'speedup':>10}")
+    for name, (text, number) in inputs.items():
+        old = best_time(legacy_clean_text_for_speech, text, number)
+        new = best_time(clean_text_for_speech, text, number)
+        print(f"{name:<32}{len(text):>8}{old:>12.1f}{new:>12.1f}{old / new:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
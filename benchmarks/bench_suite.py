@@ -0,0 +1,276 @@
+"""Microbenchmarks for story generation, speech clean-up, suggestions, the story stores and the archive.
+
+Run from the repository root:
+
+    python benchmarks/bench_suite.py                              # just run
+    python benchmarks/bench_suite.py --save-baseline before.json  # run and record a baseline
+    python benchmarks/bench_suite.py --baseline before.json       # run and compare with it
+    python benchmarks/bench_suite.py --filter store --sizes 1000 100000 1000000
+
+Each result is the median time per call over a fixed number of repeats
+(REPEAT, or STORE_REPEAT for the slow store cases), shown with its noise:
+the interquartile range as a share of the median. When comparing, a
+benchmark whose median is more than --threshold slower than the
+baseline's is a regression and the exit status is 1. Baselines are only
+comparable on the machine they were recorded on, so none is kept in the
+repository. Stores of 1M stories need about 5 GB of RAM, so that size
+only runs when asked for with --sizes.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storygen.archive import StoryArchive
+from storygen.bulk import iter_stories, write_jsonl
+from storygen.speech import clean_text_for_speech
+from storygen.sqlite_store import SQLiteStoryStore
+from storygen.store import StoryStore
+from storygen.suggestions import get_random_suggestion, random_inputs
+from storygen.templates import generate_story
+from storygen.themes import THEMES
+
+STORE_SIZES = [1_000, 100_000]
+REPEAT = 15
+STORE_REPEAT = 9
+THRESHOLD = 0.20
+
+def time_calls(func, repeat=REPEAT):
+    """Seconds per call from each repeat, looping enough for each to take at least 0.2 s"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return [seconds / number for seconds in timer.repeat(repeat=repeat, number=number)]
+
+def time_each(func, setup=None, repeat=STORE_REPEAT):
+    """Seconds for each of repeat single calls of a slow operation, running setup (untimed) before each"""
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return times
+
+def summarize(times):
+    """(median, noise) of a benchmark's samples; noise is the interquartile range over the median"""
+    median = statistics.median(times)
+    quartiles = statistics.quantiles(times, n=4)
+    return median, (quartiles[2] - quartiles[0]) / median
+
+# === Engine benchmarks ===
+
+def engine_benchmarks():
+    rng = random.Random(1)
+    inputs = random_inputs(rng)
+    for theme in THEMES:
+        yield f"generate_story[{theme}]", lambda theme=theme: time_calls(lambda: generate_story(inputs, theme, rng))
+
+    stories = [record["story"] for record in iter_stories(20, seed=1)]
+    short, long = stories[0], "\n\n".join(stories)
+    yield "clean_text_for_speech[short]", lambda: time_calls(lambda: clean_text_for_speech(short))
+    yield "clean_text_for_speech[long]", lambda: time_calls(lambda: clean_text_for_speech(long))
+
+    yield "get_random_suggestion", lambda: time_calls(lambda: get_random_suggestion("noun", rng))
+    yield "surprise_me (random_inputs)", lambda: time_calls(lambda: random_inputs(rng))
+
+# === Store benchmarks ===
+
+def write_journal(path, count):
+    records = (dict(record, timestamp="2024-01-01 00:00:00") for record in iter_stories(count, seed=1))
+    write_jsonl(records, path)
+
+def store_benchmarks(count, workdir):
+    """Benchmarks for stores holding count stories"""
+    missing = os.path.join(workdir, "missing.json")
+    journal = os.path.join(workdir, f"stories-{count}.jsonl")
+    copy = os.path.join(workdir, "copy.jsonl")
+    database = os.path.join(workdir, "stories.db")
+    archive = os.path.join(workdir, "stories.archive")
+    loaded = {}
+
+    def ensure_journal():
+        if not os.path.exists(journal):
+            write_journal(journal, count)
+
+    def jsonl_load():
+        ensure_journal()
+        return time_each(lambda: StoryStore(journal, missing, archive_threshold=None).load())
+
+    def loaded_store():
+        # One store with every record in memory, shared by the cases for this size
+        if "store" not in loaded:
+            ensure_journal()
+            shutil.copyfile(journal, copy)
+            loaded["store"] = StoryStore(copy, missing, archive_threshold=None).load()
+        return loaded["store"]
+
+    def remove_database():
+        for path in (database, database + "-wal", database + "-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def sqlite_save():
+        # Leave out anything the jsonl.add case appended
+        stories = loaded_store().stories[:count]
+        def save():
+            store = SQLiteStoryStore(database, import_from=None).load()
+            store.import_stories(stories)
+            store.close()
+        return time_each(save, setup=remove_database)
+
+    def sqlite_load():
+        if not os.path.exists(database):
+            sqlite_save()
+        def load():
+            store = SQLiteStoryStore(database, import_from=None).load()
+            store.query(limit=20)
+            store.close()
+        return time_each(load)
+
+    def sqlite_add():
+        if not os.path.exists(database):
+            sqlite_save()
+        store = SQLiteStoryStore(database, import_from=None).load()
+        try:
+            return time_calls(lambda: store.add("Funny", "A benchmark story."))
+        finally:
+            store.close()
+
+    def remove_archive():
+        for path in (archive, archive + ".index"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def archive_save():
+        stories = loaded_store().stories[:count]
+        return time_each(lambda: StoryArchive(archive).append(stories), setup=remove_archive)
+
+    def archive_load():
+        if not os.path.exists(archive):
+            archive_save()
+        return time_each(lambda: StoryArchive(archive).load().query(limit=20))
+
+    def archive_get():
+        if not os.path.exists(archive):
+            archive_save()
+        store = StoryArchive(archive).load()
+        rng = random.Random(1)
+        def get():
+            # From a cold block cache, as for a story nobody has looked at lately
+            store.cache.clear()
+            store.get(rng.randint(1, count))
+        return time_calls(get)
+
+    def cleanup():
+        # Free this size's records and files before the next size
+        loaded.clear()
+        remove_database()
+        remove_archive()
+        for path in (journal, copy):
+            if os.path.exists(path):
+                os.remove(path)
+
+    yield f"store.jsonl.load[{count}]", jsonl_load
+    yield f"store.jsonl.save[{count}]", lambda: time_each(loaded_store().compact)
+    yield f"store.jsonl.add[{count}]", lambda: time_calls(lambda: loaded_store().add("Funny", "A benchmark story."))
+    yield f"store.sqlite.save[{count}]", sqlite_save
+    yield f"store.sqlite.load[{count}]", sqlite_load
+    yield f"store.sqlite.add[{count}]", sqlite_add
+    yield f"store.archive.save[{count}]", archive_save
+    yield f"store.archive.load[{count}]", archive_load
+    yield f"store.archive.get[{count}]", archive_get
+    yield None, cleanup
+
+# === Reporting ===
+
+def format_seconds(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+def load_baseline(path):
+    """{name: {"median": ..., "noise": ...}} from a saved baseline (empty if there is none yet)"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            results = json.load(f)["results"]
+    except FileNotFoundError:
+        return {}
+    # Baselines from before noise was measured hold one time per benchmark
+    return {name: result if isinstance(result, dict) else {"median": result, "noise": 0.0}
+            for name, result in results.items()}
+
+def save_baseline(path, results):
+    baseline = {
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "recorded": time.strftime("%Y-%m-%d %H:%M:%S"),
+        # Keep results from benchmarks that were filtered out of this run
+        "results": {**load_baseline(path), **results},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the storygen microbenchmarks")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--sizes", type=int, nargs="+", default=STORE_SIZES,
+                        help="Store sizes to benchmark (default: 1000 100000; 1000000 needs about 5 GB of RAM)")
+    parser.add_argument("--baseline", metavar="PATH",
+                        help="Compare with a baseline recorded on this machine by --save-baseline")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Record this run as a baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="Allowed slowdown of a median against the baseline's (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.baseline) if args.baseline else {}
+    if args.baseline and not baseline:
+        parser.error(f"no baseline at {args.baseline}; record one with --save-baseline")
+    results = {}
+    regressions = []
+    workdir = tempfile.mkdtemp(prefix="storygen-bench-")
+    try:
+        print(f"{'benchmark':<36}{'median':>12}{'noise':>8}{'baseline':>12}{'change':>10}")
+        benchmarks = [*engine_benchmarks()]
+        for count in args.sizes:
+            benchmarks += store_benchmarks(count, workdir)
+        for name, run in benchmarks:
+            if name is None:
+                run()
+                continue
+            if args.filter not in name:
+                continue
+            median, noise = summarize(run())
+            results[name] = {"median": median, "noise": noise}
+            line = f"{name:<36}{format_seconds(median):>12}{'±' + format(noise, '.0%'):>8}"
+            if name in baseline:
+                before = baseline[name]
+                change = median / before["median"] - 1
+                line += f"{format_seconds(before['median']):>12}{change:>+10.0%}"
+                if change > args.threshold:
+                    regressions.append(name)
+                    line += "  ⚠️ slower"
+            print(line, flush=True)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results)
+        print(f"\n📊 Baseline saved to {args.save_baseline}")
+    if regressions:
+        print(f"\n⚠️ {len(regressions)} benchmark(s) more than {args.threshold:.0%} slower than the baseline")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
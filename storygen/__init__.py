@@ -0,0 +1,23 @@
+"""Mad Libs story engine.
+
+The package root only pulls in the core (templates, suggestions, themes,
+saved-story store and speech clean-up), so it imports quickly and without
+Tk, TTS or audio. The desktop layers live in ``storygen.gui``,
+``storygen.tts`` and ``storygen.audio`` and are started explicitly.
+"""
+from .archive import StoryArchive
+from .search import SearchIndex, StoredSearchIndex, open_search_index
+from .speech import SPEECH_SUBSTITUTIONS, SpeechNormalizer, clean_text_for_speech
+from .store import STORIES_FILE, StoryStore, open_store
+from .suggestions import SILLY_SUGGESTIONS, get_random_suggestion, random_inputs
+from .templates import (
+    COMPILED_TEMPLATES,
+    STORY_TEMPLATES,
+    CompiledTemplate,
+    TemplateLibrary,
+    TemplatePackError,
+    compile_template,
+    generate_story,
+    pick_template,
+)
+from .themes import THEMES
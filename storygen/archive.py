@@ -0,0 +1,201 @@
+"""Compressed block archive for old saved stories.
+
+Records are packed in order of id into blocks of BLOCK_RECORDS JSON lines,
+each compressed on its own (zlib or lzma). A small JSON index next to the
+archive lists every block's id range, position and themes:
+
+    saved_stories.archive          MAGIC | block | block | ...
+    saved_stories.archive.index    {"codec": ..., "size": ..., "blocks": [[first_id, last_id, offset, length, count, {theme: count}], ...]}
+
+Reading a story decompresses only its block and parses only the lines
+that are asked for; recently read blocks are kept in a small cache. Blocks are only ever appended; the index is
+replaced after they are on disk, so a crash mid-write leaves the archive
+as it was.
+"""
+import bisect
+import json
+import lzma
+import os
+import zlib
+from collections import OrderedDict
+
+from .store import encode_record, render_stored, stored_form
+
+ARCHIVE_EXTENSION = ".archive"
+INDEX_SUFFIX = ".index"
+MAGIC = b"SGARCH01"
+
+BLOCK_RECORDS = 256
+BLOCK_CACHE_SIZE = 16
+
+CODECS = {
+    "zlib": (lambda data: zlib.compress(data, 9), zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+DEFAULT_CODEC = "zlib"
+
+def archive_path_for(journal_path):
+    """The archive that goes with a journal, e.g. saved_stories.jsonl -> saved_stories.archive"""
+    return os.path.splitext(journal_path)[0] + ARCHIVE_EXTENSION
+
+def encode_block(records):
+    # Stories saved as template + words stay that way; everything else keeps its text
+    return "".join(
+        encode_record(stored_form(story_data) if "template" in story_data else story_data) for story_data in records
+    ).encode("utf-8")
+
+def decode_record(line):
+    story_data = json.loads(line)
+    if "template" in story_data:
+        story_data["story"] = render_stored(story_data["template"], story_data.get("inputs"))
+    return story_data
+
+class StoryArchive:
+    """Read-mostly saved stories in compressed blocks, with the same get/query/iteration as StoryStore"""
+
+    def __init__(self, path, codec=DEFAULT_CODEC):
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        self.codec = codec
+        # [first_id, last_id, offset, length, count, themes] per block
+        self.blocks = []
+        self.first_ids = []
+        # Bytes of the archive covered by the index; anything after is an unfinished write
+        self.size = len(MAGIC)
+        self.count = 0
+        self.cache = OrderedDict()
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for i in range(len(self.blocks)):
+            lines = self._read_block(i)
+            for j in range(len(lines)):
+                yield self._record(lines, j)
+
+    @property
+    def last_id(self):
+        return self.blocks[-1][1] if self.blocks else 0
+
+    def load(self):
+        """Read the index (an empty archive if there is none yet)"""
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return self
+        self.codec = index["codec"]
+        self.size = index["size"]
+        self.blocks = index["blocks"]
+        self.first_ids = [block[0] for block in self.blocks]
+        self.count = sum(block[4] for block in self.blocks)
+        self.cache.clear()
+        return self
+
+    def get(self, story_id):
+        """Return the story with this id, or None"""
+        i = bisect.bisect_right(self.first_ids, story_id) - 1
+        if i < 0 or story_id > self.blocks[i][1]:
+            return None
+        first_id, last_id, _, _, count, _ = self.blocks[i]
+        lines = self._read_block(i)
+        if last_id - first_id + 1 == count:
+            # No gaps in the block's ids, so the story is at a known line
+            return self._record(lines, story_id - first_id)
+        j = bisect.bisect_left(range(count), story_id, key=lambda j: self._record(lines, j)["id"])
+        if j < count and self._record(lines, j)["id"] == story_id:
+            return self._record(lines, j)
+        return None
+
+    def query(self, theme=None, limit=50, before_id=None):
+        """Newest stories first, optionally for one theme and older than before_id"""
+        end = len(self.blocks)
+        if before_id is not None:
+            end = bisect.bisect_left(self.first_ids, before_id)
+        # Lines without this text can't be the theme's, so they are skipped unparsed
+        needle = None if theme is None else f'"theme": {json.dumps(theme, ensure_ascii=False)}'.encode("utf-8")
+        results = []
+        for i in range(end - 1, -1, -1):
+            if len(results) >= limit:
+                break
+            first_id, last_id, _, _, count, themes = self.blocks[i]
+            # The index says which blocks hold the theme, so the rest are never decompressed
+            if theme is not None and not themes.get(theme):
+                continue
+            lines = self._read_block(i)
+            start = count - 1
+            if before_id is not None and last_id - first_id + 1 == count:
+                start = min(start, before_id - first_id - 1)
+            for j in range(start, -1, -1):
+                if needle is not None and isinstance(lines[j], bytes) and needle not in lines[j]:
+                    continue
+                story_data = self._record(lines, j)
+                if before_id is not None and story_data["id"] >= before_id:
+                    continue
+                if theme is None or story_data["theme"] == theme:
+                    results.append(story_data)
+                    if len(results) >= limit:
+                        break
+        return results
+
+    def _read_block(self, i):
+        """Block i's lines; each is parsed into its record the first time it is used"""
+        lines = self.cache.get(i)
+        if lines is not None:
+            self.cache.move_to_end(i)
+            return lines
+        _, _, offset, length, _, _ = self.blocks[i]
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            data = f.read(length)
+        # Split as bytes: each line is only decoded (by json) when it is used
+        lines = CODECS[self.codec][1](data).split(b"\n")[:-1]
+        self.cache[i] = lines
+        if len(self.cache) > BLOCK_CACHE_SIZE:
+            self.cache.popitem(last=False)
+        return lines
+
+    def _record(self, lines, j):
+        story_data = lines[j]
+        if isinstance(story_data, bytes):
+            story_data = lines[j] = decode_record(story_data)
+        return story_data
+
+    def append(self, records):
+        """Pack records (in id order, all newer than last_id) into new blocks at the end of the archive"""
+        records = [story_data for story_data in records if story_data["id"] > self.last_id]
+        if not records:
+            return 0
+        compress = CODECS[self.codec][0]
+        blocks = list(self.blocks)
+        mode = "r+b" if os.path.exists(self.path) else "w+b"
+        with open(self.path, mode) as f:
+            if mode == "w+b":
+                f.write(MAGIC)
+            # Drop whatever an interrupted append left past the indexed end
+            f.truncate(self.size)
+            f.seek(self.size)
+            for start in range(0, len(records), BLOCK_RECORDS):
+                chunk = records[start:start + BLOCK_RECORDS]
+                data = compress(encode_block(chunk))
+                themes = {}
+                for story_data in chunk:
+                    themes[story_data["theme"]] = themes.get(story_data["theme"], 0) + 1
+                blocks.append([chunk[0]["id"], chunk[-1]["id"], f.tell(), len(data), len(chunk), themes])
+                f.write(data)
+            size = f.tell()
+            f.flush()
+            os.fsync(f.fileno())
+        self._write_index(blocks, size)
+        self.blocks = blocks
+        self.first_ids = [block[0] for block in blocks]
+        self.size = size
+        self.count += len(records)
+        return len(records)
+
+    def _write_index(self, blocks, size):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "codec": self.codec, "size": size, "blocks": blocks}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
@@ -0,0 +1,211 @@
+"""Sound effects.
+
+Clips are decoded once into memory and mixed on a few voices, so playing
+one returns immediately. pygame's mixer does the decoding and mixing when
+it is installed; otherwise each clip is handed to playsound on a
+background thread.
+"""
+import os
+import random
+import threading
+import time
+
+from playsound import playsound
+
+# pygame is slow to import, so it is only imported when the audio device is opened
+pygame = None
+
+# Sound file paths
+SOUND_PATHS = {
+    "general": {
+        "drumroll": "sounds/general/drumroll.mp3",
+        "tada": "sounds/general/tada.mp3", 
+        "bye": "sounds/general/bye.mp3",
+        "startup": "sounds/general/startup.mp3",
+        "button_click": "sounds/general/button_click.mp3",
+        "error": "sounds/general/error.mp3"
+    },
+    "themes": {
+        "Funny": [
+            "sounds/themes/funny/laugh.mp3",
+            "sounds/themes/funny/comedy.mp3",
+            "sounds/themes/funny/giggle.mp3",
+        ],
+        "Spooky": [
+            "sounds/themes/spooky/spooky.mp3",
+            "sounds/themes/spooky/creepy.mp3",
+            "sounds/themes/spooky/thunder.mp3"
+        ],
+        "Sci-Fi": [
+            "sounds/themes/scifi/computer.mp3",
+            "sounds/themes/scifi/teleport.mp3"
+        ],
+        "Romantic": [
+            "sounds/themes/romantic/whistle.mp3",
+            "sounds/themes/romantic/soft_music.mp3",
+        ]
+    },
+    "actions": {
+        "surprise_me": "sounds/actions/surprise_me.mp3",
+        "generate_story": "sounds/actions/generate_story.mp3",
+        "theme_change": "sounds/actions/theme_change.mp3"
+    }
+}
+
+# How many clips can play at the same time
+MIXER_VOICES = 8
+
+# How often wait=True playback checks whether the clip has finished
+WAIT_INTERVAL = 0.02
+
+def all_sound_files():
+    for sounds in SOUND_PATHS.values():
+        for entry in sounds.values():
+            yield from (entry if isinstance(entry, list) else [entry])
+
+class SoundBank:
+    """Sound clips decoded into memory on first use (or up front with preload) and played without blocking"""
+
+    def __init__(self, voices=MIXER_VOICES):
+        self.voices = voices
+        self.lock = threading.Lock()
+        self.sounds = {}
+        self.missing = set()
+        self.mixer = False
+        # Set while start() runs on another thread; clips wait for it to finish
+        self.starting = False
+        self.started = threading.Event()
+        # Fallback playback: one thread per clip, at most `voices` at once
+        self.free_voices = threading.BoundedSemaphore(voices)
+
+    def start(self):
+        """Open the audio device; without pygame, clips fall back to playsound"""
+        global pygame
+        try:
+            os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+            import pygame
+            pygame.mixer.init()
+            pygame.mixer.set_num_channels(self.voices)
+            self.mixer = True
+        except ImportError:
+            pass
+        except Exception as e:
+            print(f"⚠️ Sound error: {e}")
+        finally:
+            self.starting = False
+            self.started.set()
+
+    def preload(self, paths):
+        """Decode every clip now so the first play of each is instant too"""
+        for path in paths:
+            self.load(path)
+
+    def load(self, path, keep=True):
+        """Decoded clip for path (None if it is missing or can't be decoded)"""
+        if self.starting:
+            self.started.wait()
+        with self.lock:
+            if path in self.sounds:
+                return self.sounds[path]
+            if path in self.missing:
+                return None
+        if not os.path.exists(path):
+            print(f"⚠️ Sound file not found: {path}")
+            sound = None
+        elif not self.mixer:
+            # Without a mixer there is nothing to decode ahead of time
+            sound = path
+        else:
+            try:
+                sound = pygame.mixer.Sound(path)
+            except Exception as e:
+                print(f"⚠️ Sound error: {e}")
+                sound = None
+        if keep:
+            with self.lock:
+                if sound is None:
+                    self.missing.add(path)
+                else:
+                    self.sounds[path] = sound
+        return sound
+
+    def play(self, path, wait=False, stop_when=None, keep=True):
+        """Start playing path and return at once; with wait=True, return once it has finished.
+
+        stop_when is polled while waiting; when it returns True the clip is cut off.
+        """
+        if self.starting:
+            # The device is still opening: don't hold up the caller unless it asked to wait
+            if not wait:
+                threading.Thread(target=self.play, args=(path, True, stop_when, keep), daemon=True).start()
+                return
+            self.started.wait()
+        sound = self.load(path, keep)
+        if sound is None:
+            return
+        if self.mixer:
+            try:
+                channel = sound.play()
+                if channel is None or not wait:
+                    return
+                while channel.get_busy():
+                    if stop_when is not None and stop_when():
+                        channel.stop()
+                        return
+                    time.sleep(WAIT_INTERVAL)
+            except Exception as e:
+                print(f"⚠️ Sound error: {e}")
+        elif wait:
+            self._play_fallback(path)
+        elif self.free_voices.acquire(blocking=False):
+            threading.Thread(target=self._play_fallback, args=(path, True), daemon=True).start()
+
+    def _play_fallback(self, path, release=False):
+        try:
+            playsound(path)
+        except Exception as e:
+            print(f"⚠️ Sound error: {e}")
+        finally:
+            if release:
+                self.free_voices.release()
+
+sound_bank = SoundBank()
+
+def init_audio():
+    """Open the audio device and decode all sound effects in the background"""
+    def start_and_preload():
+        sound_bank.start()
+        sound_bank.preload(all_sound_files())
+    sound_bank.starting = True
+    threading.Thread(target=start_and_preload, name="audio-init", daemon=True).start()
+
+def play_sound(sound_key, category="general", wait=False):
+    """Enhanced sound playing function with organized structure"""
+    if category == "themes":
+        # For themes, sound_key is the theme name; pick a random sound from its list
+        if sound_key not in SOUND_PATHS["themes"]:
+            return
+        sound_file = random.choice(SOUND_PATHS["themes"][sound_key])
+    else:
+        # For general and action sounds
+        if sound_key not in SOUND_PATHS[category]:
+            return
+        sound_file = SOUND_PATHS[category][sound_key]
+    sound_bank.play(sound_file, wait)
+
+def pick_theme_sound(theme):
+    """Path of a random sound for the theme (None if it has none)"""
+    sounds = SOUND_PATHS["themes"].get(theme)
+    return random.choice(sounds) if sounds else None
+
+def play_theme_sound(theme, wait=False):
+    """Play a random sound for the given theme"""
+    play_sound(theme, "themes", wait)
+
+def play_action_sound(action):
+    """Play sound for specific actions"""
+    play_sound(action, "actions")
+
+def play_file(path, stop_when=None):
+    """Play an audio file that isn't one of the named sounds, returning when it ends"""
+    sound_bank.play(path, wait=True, stop_when=stop_when, keep=False)
@@ -0,0 +1,93 @@
+"""Headless bulk story generation streamed to JSON Lines"""
+import json
+import random
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .sampling import SamplerSet
+from .suggestions import random_inputs
+from .templates import generate_story
+from .themes import THEMES
+
+def new_seed():
+    """Pick a fresh seed for a bulk run"""
+    return random.randrange(2**32)
+
+def story_rng(seed, story_id):
+    """Random generator for one story, derived only from (seed, story_id)"""
+    return random.Random(f"{seed}:{story_id}")
+
+def iter_stories(count, theme=None, seed=None, start=1, no_repeat=False):
+    """Yield story records one at a time so memory stays flat for any count.
+
+    Each story gets its own generator from story_rng(), so a given
+    (seed, id) pair always produces the same story however the run is split.
+    With no_repeat, words and templates are drawn through no-repeat samplers
+    that start fresh for each call (each shard), so output still only
+    depends on the seed and shard size.
+    """
+    if seed is None:
+        seed = new_seed()
+    themes = list(THEMES)
+    samplers = SamplerSet() if no_repeat else None
+    for story_id in range(start, start + count):
+        rng = story_rng(seed, story_id)
+        story_theme = theme or rng.choice(themes)
+        inputs = random_inputs(rng, samplers)
+        yield {
+            "id": story_id,
+            "theme": story_theme,
+            "inputs": inputs,
+            "story": generate_story(inputs, story_theme, rng, samplers),
+        }
+
+def render_shard(start, stop, theme, seed, no_repeat=False):
+    """Render stories start..stop-1 as a block of JSON Lines text"""
+    return "".join(
+        json.dumps(record, ensure_ascii=False) + "\n"
+        for record in iter_stories(stop - start, theme, seed, start, no_repeat)
+    )
+
+def iter_jsonl_shards(count, theme=None, seed=None, workers=1, shard_size=10000, no_repeat=False):
+    """Yield JSON Lines text shard by shard, in id order.
+
+    With workers > 1 the shards are rendered by a process pool. Only a few
+    shards per worker are in flight at once, so memory stays bounded.
+    """
+    if seed is None:
+        seed = new_seed()
+    shards = (
+        (start, min(start + shard_size, count + 1), theme, seed, no_repeat)
+        for start in range(1, count + 1, shard_size)
+    )
+    if workers <= 1:
+        for shard in shards:
+            yield render_shard(*shard)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for shard in shards:
+            pending.append(pool.submit(render_shard, *shard))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def write_lines(chunks, path):
+    """Stream text chunks to a file ('-' for stdout) and return how many lines were written"""
+    out = sys.stdout if path == "-" else open(path, "w", encoding="utf-8", buffering=1 << 20)
+    written = 0
+    try:
+        for chunk in chunks:
+            out.write(chunk)
+            written += chunk.count("\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return written
+
+def write_jsonl(records, path):
+    """Stream records to a JSON Lines file ('-' for stdout) and return how many were written"""
+    return write_lines((json.dumps(record, ensure_ascii=False) + "\n" for record in records), path)
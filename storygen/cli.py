@@ -0,0 +1,109 @@
+"""Command line entry point.
+
+Each subcommand imports what it needs when it runs (asyncio for serve, a
+process pool for generate, ...), so starting the desktop app doesn't pay
+for them.
+"""
+import argparse
+import sys
+
+from .store import KEEP_IN_JOURNAL, StoryStore, open_store
+from .suggestions import SILLY_SUGGESTIONS
+from .themes import THEMES
+from .timing import enable_timings
+from .wordbank import WORD_BANK_DIR
+
+def positive_int(text):
+    """argparse type for counts and sizes: a whole number of at least 1"""
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {value}")
+    return value
+
+def main(argv=None, started=None):
+    """Run the command in argv; started is the perf_counter() time the process began, for the startup report"""
+    parser = argparse.ArgumentParser(description="Mad Libs Story Generator")
+    parser.add_argument("--store", choices=["jsonl", "sqlite"], default="jsonl",
+                        help="Where saved stories are kept (default: jsonl)")
+    parser.add_argument("--inputs-only", action="store_true",
+                        help="Save generated stories as their template and words only, rendered again on load "
+                             "(smallest archive, but a story is lost if its template is removed)")
+    parser.add_argument("--timings", metavar="DIR",
+                        help="Record how long each phase of a story takes to DIR/timings.jsonl and DIR/storygen.prom")
+    commands = parser.add_subparsers(dest="command")
+
+    generate = commands.add_parser("generate", help="Generate stories headlessly to a JSON Lines file")
+    generate.add_argument("--count", type=positive_int, default=1, help="Number of stories to generate")
+    generate.add_argument("--theme", choices=list(THEMES), help="Theme for every story (random per story if omitted)")
+    generate.add_argument("--out", default="-", help="Output file, or '-' for stdout")
+    generate.add_argument("--seed", type=int, help="Seed for reproducible output (random if omitted)")
+    generate.add_argument("--workers", type=positive_int, default=1, help="Number of worker processes")
+    generate.add_argument("--shard-size", type=positive_int, default=10000, help="Stories per worker task")
+    generate.add_argument("--no-repeat", action="store_true",
+                          help="Don't repeat recently used words or templates (within each shard)")
+
+    search = commands.add_parser("search", help="Search saved stories")
+    search.add_argument("query", help="Words to look for in the story, its theme or its input words")
+    search.add_argument("--theme", choices=list(THEMES), help="Only search stories with this theme")
+    search.add_argument("--limit", type=int, default=10, help="Maximum number of results")
+
+    wordbank = commands.add_parser("wordbank", help="Build word banks from word lists")
+    wordbank.add_argument("source", help="Folder with one <field>.txt word list per field (one word per line)")
+    wordbank.add_argument("--out", default=WORD_BANK_DIR, help=f"Where to write the banks (default: {WORD_BANK_DIR})")
+
+    archive = commands.add_parser("archive", help="Move older saved stories into the compressed archive")
+    archive.add_argument("--keep", type=int, default=KEEP_IN_JOURNAL,
+                         help=f"Newest stories to leave in the journal (default: {KEEP_IN_JOURNAL})")
+    archive.add_argument("--codec", help="Compression when starting a new archive: zlib (the default) or lzma")
+
+    serve = commands.add_parser("serve", help="Serve stories, suggestions and saved stories over HTTP")
+    serve.add_argument("--host", help="Address to listen on (default: 127.0.0.1, this computer only)")
+    serve.add_argument("--port", type=int, help="Port to listen on (default: 8000)")
+
+    args = parser.parse_args(argv)
+    if args.command == "generate":
+        from .bulk import iter_jsonl_shards, new_seed, write_lines
+        seed = new_seed() if args.seed is None else args.seed
+        shards = iter_jsonl_shards(args.count, args.theme, seed, args.workers, args.shard_size, args.no_repeat)
+        written = write_lines(shards, args.out)
+        print(f"📚 Generated {written} stories (seed {seed})", file=sys.stderr)
+    elif args.command == "search":
+        from .search import open_search_index
+        # Only reads: the journal is left for the app to compact and archive
+        store = open_store(args.store, read_only=True)
+        results = open_search_index(store).search(args.query, args.limit, args.theme)
+        # The index can name a story the store no longer has (e.g. a skipped damaged line)
+        found = [(score, story) for score, story in ((score, store.get(story_id)) for score, story_id in results) if story]
+        if not found:
+            print(f"📭 No stories match \"{args.query}\".")
+        for score, story in found:
+            print(f"📖 Story #{story['id']} - {story['theme']} ({story['timestamp']})  score {score:.2f}")
+            print("="*50)
+            print(story['story'] + "\n")
+    elif args.command == "wordbank":
+        from .wordbank import build_banks
+        written = build_banks(args.source, SILLY_SUGGESTIONS, SILLY_SUGGESTIONS, args.out)
+        if not written:
+            print(f"📭 No word lists found in {args.source}")
+        for field, count in written.items():
+            print(f"📚 {field}: {count} words")
+    elif args.command == "archive":
+        from .archive import CODECS, DEFAULT_CODEC
+        codec = DEFAULT_CODEC if args.codec is None else args.codec
+        if codec not in CODECS:
+            parser.error(f"argument --codec: invalid choice: {codec!r} (choose from {', '.join(CODECS)})")
+        store = StoryStore(archive_threshold=None).load()
+        if not len(store.archive):
+            store.archive.codec = codec
+        moved = store.roll(args.keep)
+        print(f"🗜️ Archived {moved} stories, {len(store.archive)} in {store.archive.path} ({store.archive.codec})")
+    elif args.command == "serve":
+        from .server import DEFAULT_HOST, DEFAULT_PORT, run_server
+        host = DEFAULT_HOST if args.host is None else args.host
+        port = DEFAULT_PORT if args.port is None else args.port
+        run_server(open_store(args.store, args.inputs_only), host, port)
+    else:
+        from .gui import run_app
+        if args.timings:
+            enable_timings(args.timings)
+        run_app(args.store, args.inputs_only, started)
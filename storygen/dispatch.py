@@ -0,0 +1,116 @@
+"""Handing work between the Tk thread and background threads.
+
+Tk widgets may only be touched from the thread running the main loop.
+Background threads post widget updates to a UiQueue, which the Tk thread
+drains with root.after. Long jobs (generating and presenting a story) go
+to a CoalescingExecutor, which runs a fixed number of worker threads and
+keeps only the newest job waiting, so rapid clicks never pile up threads.
+"""
+import queue
+import threading
+
+# How often the Tk thread drains posted updates, and how many it runs per tick
+UI_POLL_MS = 15
+UI_BATCH = 100
+
+class UiQueue:
+    """Calls posted from any thread, run on the Tk thread"""
+
+    def __init__(self, poll_ms=UI_POLL_MS, batch=UI_BATCH):
+        self.poll_ms = poll_ms
+        self.batch = batch
+        self.calls = queue.SimpleQueue()
+        self.root = None
+        self.thread = None
+
+    def start(self, root):
+        """Start draining on root's main loop; call this from the Tk thread"""
+        self.root = root
+        self.thread = threading.current_thread()
+        self.root.after(self.poll_ms, self._drain)
+
+    def call(self, fn, *args):
+        """Run fn(*args) on the Tk thread soon, without waiting for it"""
+        self.calls.put((fn, args, None))
+
+    def ask(self, fn, *args):
+        """Run fn(*args) on the Tk thread and return its result (e.g. a dialog answer)"""
+        if threading.current_thread() is self.thread:
+            return fn(*args)
+        reply = {"done": threading.Event()}
+        self.calls.put((fn, args, reply))
+        reply["done"].wait()
+        if "error" in reply:
+            raise reply["error"]
+        return reply.get("result")
+
+    def _drain(self):
+        for _ in range(self.batch):
+            try:
+                fn, args, reply = self.calls.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                result = fn(*args)
+                if reply is not None:
+                    reply["result"] = result
+            except Exception as e:
+                if reply is not None:
+                    reply["error"] = e
+                else:
+                    print(f"⚠️ UI update error: {e}")
+            finally:
+                if reply is not None:
+                    reply["done"].set()
+        self.root.after(self.poll_ms, self._drain)
+
+class CoalescingExecutor:
+    """Runs jobs on a fixed pool of worker threads, keeping only the newest job waiting.
+
+    Submitting while every worker is busy replaces the job already waiting
+    (if any) instead of queueing behind it: only the latest click matters.
+    """
+
+    def __init__(self, workers=1, name="jobs"):
+        self.condition = threading.Condition()
+        self.pending = None
+        self.running = 0
+        self.submitted = 0
+        self.coalesced = 0
+        self.threads = [threading.Thread(target=self._work, name=f"{name}-{i}", daemon=True)
+                        for i in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, fn, *args):
+        with self.condition:
+            if self.pending is not None:
+                self.coalesced += 1
+            self.pending = (fn, args)
+            self.submitted += 1
+            self.condition.notify()
+
+    def metrics(self):
+        with self.condition:
+            return {
+                "running": self.running,
+                "waiting": int(self.pending is not None),
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+            }
+
+    def _work(self):
+        while True:
+            with self.condition:
+                while self.pending is None:
+                    self.condition.wait()
+                fn, args = self.pending
+                self.pending = None
+                self.running += 1
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"⚠️ Job error: {e}")
+            finally:
+                with self.condition:
+                    self.running -= 1
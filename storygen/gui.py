@@ -0,0 +1,366 @@
+"""Tkinter desktop app: the window, its controls and the story presentation"""
+import threading
+import time
+import tkinter as tk
+from tkinter import messagebox, ttk
+
+from .audio import init_audio, play_action_sound, play_sound
+from .dispatch import CoalescingExecutor, UiQueue
+from .presentation import StoryPresentation
+from .sampling import no_repeat
+from .search import SearchIndex, open_search_index
+from .store import open_store
+from .styles import StyleRegistry
+from .suggestions import get_random_suggestion
+from .templates import pick_template
+from .themes import THEMES
+from .timing import record_span, span
+from .tts import URGENT, cancel_speech, init_tts, speak, speak_cached
+from .viewer import SavedStoriesViewer
+
+# Time from run_app() until the window is drawn, in milliseconds
+STARTUP_BUDGET_MS = 300
+
+# === Global Variables ===
+store = None
+store_loaded = threading.Event()
+search_index = None
+search_ready = threading.Event()
+current_theme = "Funny"
+last_story = None
+current_narration = None
+current_presentation = None
+
+# Background work posts widget updates here; only the Tk thread touches widgets
+ui = UiQueue()
+story_jobs = None
+story_lock = threading.Lock()
+story_serial = 0
+
+# Widgets subscribe to theme roles here; apply_theme restyles them all at once
+styles = StyleRegistry(THEMES[current_theme])
+
+def surprise_me():
+    """Fill all fields with random silly words"""
+    place_var.set(get_random_suggestion("place", samplers=no_repeat))
+    adj_var.set(get_random_suggestion("adjective", samplers=no_repeat))
+    noun_var.set(get_random_suggestion("noun", samplers=no_repeat))
+    verb_var.set(get_random_suggestion("verb", samplers=no_repeat))
+    adv_var.set(get_random_suggestion("adverb", samplers=no_repeat))
+    name_var.set(get_random_suggestion("name", samplers=no_repeat))
+    
+    play_action_sound("surprise_me")
+    messagebox.showinfo("Surprise!", "🎲 Random words loaded! Prepare for chaos! 🎲")
+    speak_cached("Surprise! I've filled everything with wonderfully ridiculous words!", URGENT)
+
+def load_store(backend, inputs_only=False):
+    global store, search_index
+    try:
+        store = open_store(backend, inputs_only)
+    except Exception as e:
+        print(f"⚠️ Could not load saved stories: {e}")
+    finally:
+        store_loaded.set()
+    # Off the Tk thread: the first build reads every saved story
+    try:
+        if store is not None:
+            search_index = open_search_index(store)
+    except Exception as e:
+        print(f"⚠️ Could not open the search index: {e}")
+    finally:
+        search_ready.set()
+
+def get_store():
+    """The saved-story store, waiting for the startup load if it hasn't finished"""
+    store_loaded.wait()
+    return store
+
+def get_search_index():
+    """The search index, waiting for the startup build; caught up with stories `serve` saved since"""
+    global search_index
+    search_ready.wait()
+    if search_index is None:
+        # Couldn't be opened on disk: make do with one in memory
+        search_index = SearchIndex()
+    return search_index.sync(get_store())
+
+def save_story():
+    """Save the current story"""
+    current_story = story_output.get("1.0", tk.END).strip()
+    if current_story:
+        # Keep the words and template the story was made from, unless it has been replaced since
+        inputs = template = None
+        if last_story and last_story["story"] == current_story:
+            inputs = last_story["inputs"]
+            template = last_story["template"]
+        try:
+            with span("save", theme=current_theme):
+                story_data = get_store().add(current_theme, current_story, inputs, template)
+                if search_index is not None:
+                    search_index.add(story_data)
+            story_id = story_data["id"]
+            play_action_sound("save_story")
+            messagebox.showinfo("Saved!", f"📚 Story #{story_id} saved successfully!")
+            speak(f"Story number {story_id} has been saved to your collection!", URGENT)
+        except Exception as e:
+            play_sound("error")
+            messagebox.showerror("Error", f"Could not save story: {e}")
+
+def view_saved_stories():
+    """Open the Saved Stories window"""
+    store = get_store()
+    # Pick up stories `serve` saved to the same store while the app was open
+    if store is not None:
+        store.refresh()
+    if not store:
+        messagebox.showinfo("No Stories", "📭 No saved stories yet! Create some masterpieces first!")
+        return
+    
+    play_action_sound("load_story")
+    with span("view"):
+        SavedStoriesViewer(root, store, styles, get_search_index)
+
+def apply_theme():
+    """Apply the selected theme to every window (quietly; see change_theme)"""
+    global current_theme
+    current_theme = theme_var.get()
+    theme_config = THEMES[current_theme]
+    styles.apply(theme_config)
+    
+    # Update the title with theme emoji
+    title_label.config(text=f"{theme_config['emoji']} Mad Libs Story Generator {theme_config['emoji']}")
+
+def change_theme():
+    """Switch to the theme picked in the menu, with sound and a spoken comment"""
+    apply_theme()
+    play_action_sound("theme_change")
+    # A random word each time, so not worth a cache entry
+    speak(f"Theme changed to {current_theme}! Looking {get_random_suggestion('adjective', samplers=no_repeat)}!", URGENT)
+
+# === Story Execution ===
+# Runs on the story job thread; widgets are only touched through ui
+def run_story_job(serial, inputs, theme):
+    global current_presentation, current_narration
+    with span("render", theme=theme, run=serial):
+        template = pick_template(theme, samplers=no_repeat)
+        story = template.render(inputs)
+    presentation = StoryPresentation(story, theme)
+    with story_lock:
+        # A newer click arrived while this job was waiting or generating
+        if serial != story_serial:
+            return
+        current_presentation = presentation
+        current_narration = presentation.narration
+    ui.call(show_story, story, inputs, template.id)
+
+    # Drumroll, intro, narration and sound effects overlap on the theme's timeline.
+    # Narration goes sentence by sentence so it can be paused or skipped.
+    finished = presentation.run()
+    presentation.record_timings(run=serial)
+    ui.call(narration_finished, presentation.narration)
+    if not finished:
+        return
+    
+    # Ask if user wants to play again
+    user_response = ui.ask(messagebox.askyesno, "Play Again?", "🔁 Want to play another story?")
+    if not user_response:
+        # emoji is only needed here, so it isn't imported at startup
+        import emoji
+        speak_cached(emoji.emojize("👋 ", language="alias") + "Okay! See you next time!", URGENT, wait=True)
+        play_sound("bye", wait=True)
+        ui.call(root.quit)
+
+def show_story(story, inputs, template_id):
+    global last_story
+    last_story = {"story": story, "inputs": inputs, "template": template_id}
+    story_output.config(state="normal")
+    story_output.delete("1.0", tk.END)
+    story_output.insert(tk.END, story)
+    story_output.config(state="disabled")
+    narration_started()
+
+def toggle_pause():
+    """Pause or resume the story being narrated"""
+    narration = current_narration
+    if narration is None:
+        return
+    if narration.paused:
+        narration.resume()
+        pause_button.config(text="⏸ Pause")
+    else:
+        narration.pause()
+        pause_button.config(text="▶ Resume")
+
+def skip_sentence():
+    """Skip the sentence being narrated"""
+    if current_narration is not None:
+        current_narration.skip()
+
+def narration_started():
+    pause_button.config(text="⏸ Pause", state="normal")
+    skip_button.config(state="normal")
+
+def narration_finished(narration):
+    global current_narration
+    # A newer story may already have taken over the controls
+    if current_narration is narration:
+        current_narration = None
+        pause_button.config(text="⏸ Pause", state="disabled")
+        skip_button.config(state="disabled")
+
+def start_story():
+    global story_serial
+    started = time.perf_counter()
+    inputs = {
+        "place": place_var.get(),
+        "adjective": adj_var.get(),
+        "noun": noun_var.get(),
+        "verb": verb_var.get(),
+        "adverb": adv_var.get(),
+        "name": name_var.get(),
+    }
+
+    if not all(inputs.values()):
+        messagebox.showwarning("Missing Info", "Please fill all the fields! Or use 'Surprise Me!' for instant chaos! 🎲")
+        speak_cached("Oops! You forgot to fill some fields. Use the surprise me button if you're feeling adventurous!", URGENT)
+        return
+
+    theme = theme_var.get()
+    with story_lock:
+        story_serial += 1
+        if current_presentation is not None:
+            current_presentation.cancel()
+    cancel_speech("story")
+    # One story at a time; clicks made meanwhile collapse into the latest one
+    record_span("input", time.perf_counter() - started, theme=theme, run=story_serial)
+    story_jobs.submit(run_story_job, story_serial, inputs, theme)
+
+# === GUI Setup ===
+def add_input(label, var, field_name):
+    row = styles.style(ttk.Frame(input_frame), "frame")
+    styles.style(ttk.Label(row, text=label, width=12, anchor="w"), "label").pack(side=tk.LEFT)
+    entry = tk.Entry(row, textvariable=var, font=("Arial", 12), width=25)
+    entry.pack(side=tk.LEFT, padx=5)
+    
+    # Add suggestion button for each field
+    suggestion_btn = ttk.Button(row, text="💡", command=lambda: var.set(get_random_suggestion(field_name, samplers=no_repeat)),
+                                width=3)
+    styles.style(suggestion_btn, "accent_button")
+    suggestion_btn.pack(side=tk.LEFT, padx=2)
+    row.pack(pady=3)
+
+def build_gui():
+    """Create the main window and all of its widgets"""
+    global root, title_label, input_frame, story_output, status_label, pause_button, skip_button
+    global place_var, adj_var, noun_var, verb_var, adv_var, name_var, theme_var
+
+    root = tk.Tk()
+    root.title("🎭 Mad Libs Story Generator")
+    root.geometry("750x700")
+    styles.style(root, "window")
+
+    # Title
+    title_label = styles.style(ttk.Label(root, text="🎭 Mad Libs Story Generator 🎭"), "title")
+    title_label.pack(pady=10)
+
+    # Input frame
+    input_frame = styles.style(ttk.Frame(root), "frame")
+    input_frame.pack(pady=5)
+
+    place_var = tk.StringVar()
+    adj_var = tk.StringVar()
+    noun_var = tk.StringVar()
+    verb_var = tk.StringVar()
+    adv_var = tk.StringVar()
+    name_var = tk.StringVar()
+    theme_var = tk.StringVar(value="Funny")
+
+    add_input("Place:", place_var, "place")
+    add_input("Adjective:", adj_var, "adjective")
+    add_input("Noun:", noun_var, "noun")
+    add_input("Verb:", verb_var, "verb")
+    add_input("Adverb:", adv_var, "adverb")
+    add_input("Name:", name_var, "name")
+
+    # Theme selection and controls
+    control_frame = styles.style(ttk.Frame(root), "frame")
+    control_frame.pack(pady=10)
+
+    styles.style(ttk.Label(control_frame, text="Select Theme:"), "label").pack(side=tk.LEFT, padx=5)
+    theme_menu = tk.OptionMenu(control_frame, theme_var, "Funny", "Spooky", "Sci-Fi", "Romantic", command=lambda x: change_theme())
+    theme_menu.pack(side=tk.LEFT, padx=5)
+
+    # Fun buttons
+    button_frame = styles.style(ttk.Frame(root), "frame")
+    button_frame.pack(pady=10)
+
+    styles.style(ttk.Button(button_frame, text="🎲 Surprise Me!", command=surprise_me),
+                 "button").pack(side=tk.LEFT, padx=5)
+
+    styles.style(ttk.Button(button_frame, text="📝 Generate Story", command=start_story),
+                 "button").pack(side=tk.LEFT, padx=5)
+
+    styles.style(ttk.Button(button_frame, text="💾 Save Story", command=save_story),
+                 "button").pack(side=tk.LEFT, padx=5)
+
+    styles.style(ttk.Button(button_frame, text="📚 View Saved", command=view_saved_stories),
+                 "button").pack(side=tk.LEFT, padx=5)
+
+    # Narration controls
+    narration_frame = styles.style(ttk.Frame(root), "frame")
+    narration_frame.pack()
+
+    pause_button = styles.style(ttk.Button(narration_frame, text="⏸ Pause", command=toggle_pause, state="disabled"),
+                                "button")
+    pause_button.pack(side=tk.LEFT, padx=5)
+
+    skip_button = styles.style(ttk.Button(narration_frame, text="⏭ Skip", command=skip_sentence, state="disabled"),
+                               "button")
+    skip_button.pack(side=tk.LEFT, padx=5)
+
+    # Output section
+    styles.style(ttk.Label(root, text="📖 Your Hilarious Story"), "label").pack(pady=(20,5))
+
+    story_output = tk.Text(root, font=("Arial", 11), height=12, wrap="word", state="disabled", 
+                          relief="sunken", borderwidth=2)
+    styles.style(story_output, "text")
+    story_output.pack(padx=20, pady=10, fill="both", expand=True)
+
+    # Status bar
+    status_frame = styles.style(ttk.Frame(root), "frame")
+    status_frame.pack(fill="x", side="bottom")
+    status_label = styles.style(ttk.Label(status_frame, text="🎭 Ready to create some comedy gold! Click 'Surprise Me!' for instant fun!"),
+                                "label")
+    status_label.pack(pady=5)
+
+def run_app(store_backend="jsonl", inputs_only=False, started=None):
+    """Start the desktop app: the window first, then speech, sounds and saved stories in the background.
+
+    started is the perf_counter() time the process began (default: now),
+    so the startup report includes the imports before this call.
+    """
+    global story_jobs
+    if started is None:
+        started = time.perf_counter()
+    build_gui()
+    apply_theme()
+    ui.start(root)
+    story_jobs = CoalescingExecutor(name="story")
+    root.after(0, lambda: root.after_idle(window_shown, started, store_backend, inputs_only))
+    root.mainloop()
+    # Carry the recent picks over so the next session doesn't repeat them
+    no_repeat.save()
+
+def window_shown(started, store_backend, inputs_only=False):
+    """Runs once the window has been drawn: log the startup time and start everything else"""
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"⏱ Window shown after {elapsed_ms:.0f} ms")
+    if elapsed_ms > STARTUP_BUDGET_MS:
+        print(f"⚠️ Startup took {elapsed_ms:.0f} ms, over the {STARTUP_BUDGET_MS} ms budget")
+
+    init_tts()
+    init_audio()
+    threading.Thread(target=load_store, args=(store_backend, inputs_only), name="store-load", daemon=True).start()
+
+    # Welcome message
+    speak_cached("Welcome to the most ridiculously fun Mad Libs generator! Fill in the words or click surprise me for instant chaos!")
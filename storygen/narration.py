@@ -0,0 +1,106 @@
+"""Story narration, streamed sentence by sentence"""
+import re
+import threading
+import time
+
+from .speech import clean_text_for_speech
+from .tts import speak
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+def speech_sentences(text):
+    """Yield the story's sentences one at a time, cleaned up for speech"""
+    for line in text.splitlines():
+        for sentence in _SENTENCE_END.split(line):
+            sentence = clean_text_for_speech(sentence)
+            if sentence:
+                yield sentence
+
+class Narration:
+    """Speaks a story one sentence at a time through the speech worker.
+
+    The next sentence is cleaned up while the current one plays, so the
+    first words are heard as soon as the first sentence is ready. pause()
+    cuts the current sentence off and resume() starts it again; skip()
+    moves on to the next sentence.
+    """
+
+    def __init__(self, text, channel="story"):
+        self.text = text
+        self.channel = channel
+        self.lock = threading.Lock()
+        self.running = threading.Event()
+        self.running.set()
+        self.current = None
+        self.skip_requested = False
+        self.stopped = False
+        self.time_to_first_word = None
+        # Time spent cleaning sentences up for speech
+        self.normalize_seconds = 0.0
+
+    @property
+    def paused(self):
+        return not self.running.is_set()
+
+    def pause(self):
+        with self.lock:
+            self.running.clear()
+            if self.current is not None:
+                self.current.cancel()
+
+    def resume(self):
+        self.running.set()
+
+    def skip(self):
+        """Cut off the sentence being spoken and go on to the next one"""
+        with self.lock:
+            if self.current is not None:
+                self.skip_requested = True
+                self.current.cancel()
+
+    def stop(self):
+        """End the narration for good"""
+        with self.lock:
+            self.stopped = True
+            if self.current is not None:
+                self.current.cancel()
+        self.running.set()
+
+    def _next_sentence(self, sentences):
+        started = time.perf_counter()
+        sentence = next(sentences, None)
+        self.normalize_seconds += time.perf_counter() - started
+        return sentence
+
+    def run(self):
+        """Speak the story; True if it reached the end, False if it was stopped or cut off by other speech"""
+        started = time.perf_counter()
+        sentences = speech_sentences(self.text)
+        sentence = self._next_sentence(sentences)
+        while sentence is not None:
+            self.running.wait()
+            with self.lock:
+                if self.stopped:
+                    return False
+                request = speak(sentence, channel=self.channel, replace=False)
+                self.current = request
+
+            # Prepare the next sentence while this one is spoken
+            upcoming = self._next_sentence(sentences)
+            spoken = request.wait()
+
+            with self.lock:
+                self.current = None
+                skipped = self.skip_requested
+                self.skip_requested = False
+            if self.time_to_first_word is None and request.started is not None:
+                self.time_to_first_word = request.started - started
+                print(f"⏱ Narration started speaking after {self.time_to_first_word * 1000:.0f} ms")
+
+            if spoken or skipped:
+                sentence = upcoming
+            elif self.stopped or not self.paused:
+                # Replaced by newer speech on the channel
+                return False
+            # Otherwise we were paused: say the same sentence again on resume
+        return True
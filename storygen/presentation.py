@@ -0,0 +1,127 @@
+"""Story presentation: drumroll, intro, narration and sound effects on a timeline"""
+import threading
+import time
+
+from .audio import SOUND_PATHS, pick_theme_sound, sound_bank
+from .narration import Narration
+from .timing import record_span
+from .tts import prepare_cached, speak_cached
+
+# A timeline lists the stages of a presentation. Each one starts once the
+# stages in "after" have finished and those in "start_with" have started,
+# plus an optional "delay" in seconds. Stages that don't wait on each other
+# run at the same time.
+DEFAULT_TIMELINE = (
+    # Render the intro into the speech cache and decode the theme sound up front
+    {"stage": "prepare"},
+    {"stage": "drumroll"},
+    {"stage": "intro", "after": ["drumroll"]},
+    {"stage": "narration", "after": ["intro"], "delay": 0.2},
+    {"stage": "theme_sound", "after": ["narration"]},
+    {"stage": "tada", "start_with": ["theme_sound"], "delay": 0.4},
+)
+
+THEME_TIMELINES = {
+    # Let the thunder roll out before the fanfare
+    "Spooky": (
+        {"stage": "prepare"},
+        {"stage": "drumroll"},
+        {"stage": "intro", "after": ["drumroll"]},
+        {"stage": "narration", "after": ["intro"], "delay": 0.4},
+        {"stage": "theme_sound", "after": ["narration"]},
+        {"stage": "tada", "after": ["theme_sound"], "delay": 0.2},
+    ),
+    # The announcer talks over the drumroll
+    "Sci-Fi": (
+        {"stage": "prepare"},
+        {"stage": "drumroll"},
+        {"stage": "intro", "start_with": ["drumroll"], "delay": 0.5},
+        {"stage": "narration", "after": ["intro", "drumroll"], "delay": 0.2},
+        {"stage": "theme_sound", "after": ["narration"]},
+        {"stage": "tada", "start_with": ["theme_sound"], "delay": 0.3},
+    ),
+}
+
+def timeline_for(theme):
+    return THEME_TIMELINES.get(theme, DEFAULT_TIMELINE)
+
+class StoryPresentation:
+    """Runs the stages of one story's presentation on its theme's timeline.
+
+    If a stage is cut off (a newer story replaced the narration, or
+    cancel() was called), the stages still waiting never start and run()
+    returns False.
+    """
+
+    def __init__(self, story, theme, timeline=None):
+        self.story = story
+        self.theme = theme
+        self.timeline = timeline_for(theme) if timeline is None else timeline
+        self.intro = f"Here comes your {theme} story! Get ready to laugh, cry, or question reality!"
+        self.theme_sound = pick_theme_sound(theme)
+        self.narration = Narration(story)
+        self.cancelled = threading.Event()
+        self.started = {step["stage"]: threading.Event() for step in self.timeline}
+        self.finished = {step["stage"]: threading.Event() for step in self.timeline}
+        self.timings = {}
+        self.stages = {
+            "prepare": self.prepare,
+            "drumroll": lambda: self.play(SOUND_PATHS["general"]["drumroll"]),
+            # Speech runs on the "story" channel, so a newer story cuts this one off
+            "intro": lambda: speak_cached(self.intro, channel="story", wait=True),
+            "narration": self.narration.run,
+            "theme_sound": lambda: self.play(self.theme_sound),
+            "tada": lambda: self.play(SOUND_PATHS["general"]["tada"]),
+        }
+
+    def prepare(self):
+        prepare_cached(self.intro)
+        if self.theme_sound is not None:
+            sound_bank.load(self.theme_sound)
+
+    def play(self, path):
+        """Play a sound to the end, or until the presentation is cancelled"""
+        if path is not None:
+            sound_bank.play(path, wait=True, stop_when=self.cancelled.is_set)
+
+    def cancel(self):
+        self.cancelled.set()
+        self.narration.stop()
+
+    def run(self):
+        """Play the whole presentation; True if every stage ran to the end"""
+        self.t0 = time.perf_counter()
+        threads = [threading.Thread(target=self._run_step, args=(step,), daemon=True) for step in self.timeline]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return not self.cancelled.is_set()
+
+    def record_timings(self, **labels):
+        """Export each stage that ran, the narration's speech clean-up and the total as timing spans"""
+        for name, (start, end) in self.timings.items():
+            record_span(name, end - start, theme=self.theme, **labels)
+        record_span("normalize", self.narration.normalize_seconds, theme=self.theme, **labels)
+        if self.timings:
+            record_span("presentation", max(end for _, end in self.timings.values()), theme=self.theme, **labels)
+
+    def _run_step(self, step):
+        name = step["stage"]
+        try:
+            for other in step.get("after", ()):
+                self.finished[other].wait()
+            for other in step.get("start_with", ()):
+                self.started[other].wait()
+            if self.cancelled.wait(step.get("delay", 0)):
+                return
+            self.started[name].set()
+            start = time.perf_counter()
+            # Stages return False when they were cut off
+            if self.stages[name]() is False:
+                self.cancel()
+            self.timings[name] = (start - self.t0, time.perf_counter() - self.t0)
+        finally:
+            # Anything waiting on this stage must not hang if it never ran
+            self.started[name].set()
+            self.finished[name].set()
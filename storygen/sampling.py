@@ -0,0 +1,113 @@
+"""No-repeat sampling for word suggestions and templates"""
+import json
+import os
+import threading
+from collections import deque
+
+SAMPLER_STATE_FILE = "sampler_state.json"
+
+# Items held back after being picked, at most; small lists hold back half
+MAX_WINDOW = 1000
+
+def clamp_window(size, window=None):
+    """The window for a list of size items: as asked (default: half the list, up to MAX_WINDOW), below size"""
+    if window is None:
+        window = min(MAX_WINDOW, size // 2)
+    return max(0, min(window, size - 1))
+
+class RecencySampler:
+    """Picks indexes 0..size-1 at random, never repeating one of the last `window` picks.
+
+    The last `window` picks are kept in a queue, with a set for quick
+    lookups, and a pick that is among them is drawn again. That is two
+    tries on average at the default window (at most half the list); a
+    window over half the list picks from the items left instead. Memory
+    and the saved state only grow with the window, not with the list.
+    """
+
+    def __init__(self, size, window=None):
+        self.size = size
+        self.window = clamp_window(size, window)
+        self.recent = deque()
+        self.recent_set = set()
+
+    def draw(self, rng):
+        if self.window * 2 <= self.size:
+            item = rng.randrange(self.size)
+            while item in self.recent_set:
+                item = rng.randrange(self.size)
+        else:
+            allowed = [item for item in range(self.size) if item not in self.recent_set]
+            item = allowed[rng.randrange(len(allowed))]
+        if self.window:
+            self.recent.append(item)
+            self.recent_set.add(item)
+            if len(self.recent) > self.window:
+                self.recent_set.discard(self.recent.popleft())
+        return item
+
+    def to_dict(self):
+        return {"size": self.size, "window": self.window, "recent": list(self.recent)}
+
+    @classmethod
+    def from_dict(cls, data):
+        sampler = cls(data["size"], data["window"])
+        # Only the last `window` picks matter (older files kept more state than that)
+        sampler.recent = deque(data["recent"][-sampler.window:] if sampler.window else ())
+        sampler.recent_set = set(sampler.recent)
+        return sampler
+
+class SamplerSet:
+    """RecencySamplers by key (e.g. "field:noun", "theme:Funny"), optionally saved to a file.
+
+    A sampler starts over when the size of its list changes (a rebuilt word
+    bank, reloaded templates).
+    """
+
+    def __init__(self, path=None, window=None):
+        self.path = path
+        self.window = window
+        self.samplers = None
+        self.lock = threading.Lock()
+
+    def draw(self, key, size, rng):
+        """Pick an index into a list of size items for key"""
+        with self.lock:
+            if self.samplers is None:
+                self.samplers = self._load()
+            sampler = self.samplers.get(key)
+            if sampler is None or sampler.size != size or sampler.window != clamp_window(size, self.window):
+                sampler = self.samplers[key] = RecencySampler(size, self.window)
+            return sampler.draw(rng)
+
+    def _load(self):
+        if self.path is None:
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return {key: RecencySampler.from_dict(state) for key, state in data.items()}
+        except FileNotFoundError:
+            return {}
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"⚠️ Starting sampling afresh, could not read {self.path}: {e}")
+            return {}
+
+    def save(self):
+        """Write every sampler's state so the next session carries on without repeats"""
+        if self.path is None:
+            return
+        with self.lock:
+            if self.samplers is None:
+                return
+            data = {key: sampler.to_dict() for key, sampler in self.samplers.items()}
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ Could not save sampler state: {e}")
+
+# Shared by the desktop app's suggestions and stories, and kept between sessions
+no_repeat = SamplerSet(SAMPLER_STATE_FILE)
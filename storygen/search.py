@@ -0,0 +1,195 @@
+"""Full-text search over saved stories"""
+import heapq
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+# Too common to be worth a posting list
+STOP_WORDS = frozenset("""
+a an and are as at be but by for from had has have he her his i in is it its of on or
+our she so that the their them then they this to was we were with you your
+""".split())
+
+# Matches in the words the user typed count for more than matches in the template text
+FIELD_WEIGHTS = {
+    "story": 1.0,
+    "theme": 2.0,
+    "inputs": 3.0,
+}
+
+# The persistent index lives next to the store, e.g. saved_stories.jsonl.search
+SEARCH_SUFFIX = ".search"
+
+# Stories read from the store at a time when catching the index up
+SYNC_BATCH = 1000
+
+SEARCH_SCHEMA = "CREATE VIRTUAL TABLE IF NOT EXISTS stories_fts USING fts5(story, theme, inputs)"
+INSERT_FTS = "INSERT OR REPLACE INTO stories_fts (rowid, story, theme, inputs) VALUES (?, ?, ?, ?)"
+# bm25 scores are lower for better matches, with the columns weighted as FIELD_WEIGHTS
+SEARCH_COLUMNS = f"SELECT -bm25(stories_fts, {FIELD_WEIGHTS['story']}, {FIELD_WEIGHTS['theme']}, {FIELD_WEIGHTS['inputs']}) AS score, rowid FROM stories_fts WHERE stories_fts MATCH ?"
+SEARCH_ALL = SEARCH_COLUMNS + " ORDER BY score DESC, rowid DESC LIMIT ?"
+SEARCH_THEME = SEARCH_COLUMNS + " AND theme = ? ORDER BY score DESC, rowid DESC LIMIT ?"
+COUNT_FTS = "SELECT COUNT(*) FROM stories_fts"
+MAX_FTS_ID = "SELECT MAX(rowid) FROM stories_fts"
+
+def tokenize(text):
+    """Lower-cased words in text, without stop words"""
+    return [word for word in _WORD_PATTERN.findall(text.lower()) if word not in STOP_WORDS]
+
+class SearchIndex:
+    """Inverted index from words to weighted story ids, ranked with TF-IDF.
+
+    Built once from the store, then kept up to date by calling add() for
+    each newly saved story. Held in memory only: see StoredSearchIndex
+    for the index that is kept between runs.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.themes = {}
+        self.last_id = 0
+
+    def __len__(self):
+        return len(self.themes)
+
+    def build(self, stories):
+        """Index every story record (e.g. a whole store)"""
+        for story_data in stories:
+            self.add(story_data)
+        return self
+
+    def add(self, story_data):
+        """Index one story record"""
+        story_id = story_data["id"]
+        weights = {}
+        fields = {
+            "story": story_data["story"],
+            "theme": story_data["theme"],
+            "inputs": " ".join((story_data.get("inputs") or {}).values()),
+        }
+        for field, text in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            for word, count in Counter(_WORD_PATTERN.findall(text.lower())).items():
+                if word not in STOP_WORDS:
+                    weights[word] = weights.get(word, 0.0) + count * weight
+        # Damp repeated words: a story that says "pizza" ten times isn't ten times as relevant
+        for word, weight in weights.items():
+            self.postings.setdefault(word, {})[story_id] = 1 + math.log(weight)
+        self.themes[story_id] = story_data["theme"]
+        self.last_id = max(self.last_id, story_id)
+
+    def sync(self, store):
+        """Index the stories saved to store (e.g. by another process) since this index was built"""
+        for batch in saved_since(store, self.last_id):
+            self.build(batch)
+        return self
+
+    def search(self, query, limit=20, theme=None):
+        """Return (score, story_id) pairs for the best matches, best first"""
+        total = len(self.themes)
+        scores = {}
+        for word in set(tokenize(query)):
+            postings = self.postings.get(word)
+            if not postings:
+                continue
+            idf = math.log(1 + total / len(postings))
+            get_score = scores.get
+            for story_id, weight in postings.items():
+                scores[story_id] = get_score(story_id, 0.0) + weight * idf
+        if theme is not None:
+            scores = {story_id: score for story_id, score in scores.items() if self.themes[story_id] == theme}
+        # Ties go to the newest story
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], item[0]))
+        return [(score, story_id) for story_id, score in best]
+
+def saved_since(store, indexed_id):
+    """Batches of the store's stories newer than indexed_id.
+
+    Read newest first, stopping at the first story already indexed, so
+    the archive is only read when an index is first built.
+    """
+    before_id = None
+    while True:
+        batch = [story_data for story_data in store.query(None, SYNC_BATCH, before_id) if story_data["id"] > indexed_id]
+        if batch:
+            yield batch
+        if len(batch) < SYNC_BATCH:
+            return
+        before_id = batch[-1]["id"]
+
+def story_fields(story_data):
+    return story_data["story"], story_data["theme"], " ".join((story_data.get("inputs") or {}).values())
+
+class StoredSearchIndex:
+    """SQLite FTS5 index of saved stories, kept on disk between runs.
+
+    Same add/search interface as SearchIndex, but nothing is held in
+    memory and it is only built once: sync() indexes just the stories
+    saved since the last run (by this or any other process).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(SEARCH_SCHEMA)
+
+    def __len__(self):
+        return self.conn.execute(COUNT_FTS).fetchone()[0]
+
+    def build(self, stories):
+        """Index every story record (e.g. a whole store)"""
+        with self.lock, self.conn:
+            self.conn.executemany(INSERT_FTS, ((story_data["id"], *story_fields(story_data)) for story_data in stories))
+        return self
+
+    def sync(self, store):
+        """Index the stories saved to store since the index was last brought up to date"""
+        indexed_id = self.conn.execute(MAX_FTS_ID).fetchone()[0] or 0
+        if indexed_id >= store.next_id():
+            # The store was replaced by a smaller one: start over
+            with self.lock, self.conn:
+                self.conn.execute("DELETE FROM stories_fts")
+            indexed_id = 0
+        for batch in saved_since(store, indexed_id):
+            self.build(batch)
+        return self
+
+    def add(self, story_data):
+        """Index one story record"""
+        with self.lock, self.conn:
+            self.conn.execute(INSERT_FTS, (story_data["id"], *story_fields(story_data)))
+
+    def search(self, query, limit=20, theme=None):
+        """Return (score, story_id) pairs for the best matches, best first"""
+        words = sorted(set(tokenize(query)))
+        if not words:
+            return []
+        match = " OR ".join(f'"{word}"' for word in words)
+        if theme is None:
+            rows = self.conn.execute(SEARCH_ALL, (match, limit))
+        else:
+            rows = self.conn.execute(SEARCH_THEME, (match, theme, limit))
+        return [(score, story_id) for score, story_id in rows]
+
+    def close(self):
+        self.conn.close()
+
+def open_search_index(store):
+    """The search index for a loaded store, brought up to date.
+
+    Persisted with SQLite FTS5 where this Python's SQLite has it; otherwise
+    an in-memory SearchIndex is built from the whole store.
+    """
+    try:
+        index = StoredSearchIndex(store.path + SEARCH_SUFFIX)
+    except sqlite3.OperationalError as e:
+        print(f"⚠️ Search index not saved between runs ({e}), building it in memory")
+        return SearchIndex().build(store)
+    return index.sync(store)
@@ -0,0 +1,250 @@
+"""Local HTTP service for the story engine, on asyncio streams.
+
+    POST /story             {"inputs": {...}, "theme": "Funny", "save": false}
+    GET  /suggest/{field}
+    GET  /stories?theme=&page=
+
+Only the core engine and the saved-story store are used, so it runs
+without Tk, TTS or audio. Connections are kept alive (HTTP/1.1). Stories
+and suggestions are answered on the event loop, since rendering takes
+microseconds. Anything that may touch the store runs on a single store
+thread instead: saving waits for the journal lock while the desktop app
+saves or compacts, and that must not hold up the other connections.
+"""
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .sampling import SamplerSet
+from .suggestions import SILLY_SUGGESTIONS, get_random_suggestion
+from .templates import pick_template
+from .themes import THEMES
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+
+PAGE_SIZE = 20
+MAX_BODY = 64 * 1024
+MAX_HEADERS = 100
+
+# Idle keep-alive connections are closed after this many seconds
+IDLE_TIMEOUT = 30
+
+# Endpoints that may read or write the store, answered on the store thread
+STORE_PATHS = ("/story", "/stories")
+
+REASONS = {
+    200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error",
+}
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def encode_response(status, payload=None, keep_alive=True, headers=()):
+    """Raw HTTP/1.1 response bytes with a JSON body"""
+    body = b"" if payload is None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    lines = [
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+        f"Content-Length: {len(body)}",
+        "Access-Control-Allow-Origin: *",
+        "Connection: " + ("keep-alive" if keep_alive else "close"),
+        *headers,
+    ]
+    if payload is not None:
+        lines.append("Content-Type: application/json; charset=utf-8")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+class StoryService:
+    """Answers the service's requests from the engine and a loaded story store"""
+
+    def __init__(self, store=None):
+        self.store = store
+        # One thread, so store calls never run at the same time
+        self.store_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="store")
+        # Not saved between runs: the desktop app keeps its own
+        self.samplers = SamplerSet()
+        # (theme, page) -> before_id of that page, so deep pages aren't re-walked
+        self.page_marks = {}
+
+    async def handle_async(self, method, path, query, body):
+        """handle(), on the store thread for endpoints that may block on the store"""
+        if self.store is None or path not in STORE_PATHS:
+            return self.handle(method, path, query, body)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.store_thread, self.handle, method, path, query, body)
+
+    def handle(self, method, path, query, body):
+        """Return (status, payload) for one request"""
+        if path == "/story":
+            if method != "POST":
+                raise HTTPError(405, "Use POST for /story")
+            return 200, self.story(self.parse_json(body))
+        if path.startswith("/suggest/"):
+            if method != "GET":
+                raise HTTPError(405, "Use GET for /suggest")
+            return 200, self.suggest(unquote(path[len("/suggest/"):]))
+        if path == "/stories":
+            if method != "GET":
+                raise HTTPError(405, "Use GET for /stories")
+            return 200, self.stories(query)
+        raise HTTPError(404, f"No such endpoint: {path}")
+
+    def parse_json(self, body):
+        try:
+            data = json.loads(body or b"{}")
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise HTTPError(400, f"Body is not valid JSON: {e}") from None
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Body must be a JSON object")
+        return data
+
+    def story(self, data):
+        theme = data.get("theme", "Funny")
+        # Checked for type first: a list or object can't be looked up in THEMES
+        if not isinstance(theme, str) or theme not in THEMES:
+            raise HTTPError(400, f"Unknown theme: {theme}")
+        inputs = data.get("inputs")
+        if not isinstance(inputs, dict):
+            raise HTTPError(400, "inputs must be an object of words")
+        missing = [field for field in SILLY_SUGGESTIONS if field not in inputs or inputs[field] == ""]
+        if missing:
+            raise HTTPError(400, "Missing words for: " + ", ".join(missing))
+        not_words = [field for field in SILLY_SUGGESTIONS if not isinstance(inputs[field], str)]
+        if not_words:
+            raise HTTPError(400, "Words must be strings: " + ", ".join(not_words))
+        inputs = {field: inputs[field] for field in SILLY_SUGGESTIONS}
+        save = data.get("save", False)
+        if not isinstance(save, bool):
+            raise HTTPError(400, "save must be true or false")
+        template = pick_template(theme, samplers=self.samplers)
+        story = template.render(inputs)
+        if not save:
+            return {"theme": theme, "inputs": inputs, "story": story}
+        if self.store is None:
+            raise HTTPError(400, "Saving is not available: no story store")
+        story_data = self.store.add(theme, story, inputs, template.id)
+        self.page_marks.clear()
+        return story_data
+
+    def suggest(self, field):
+        if field not in SILLY_SUGGESTIONS:
+            raise HTTPError(404, f"Unknown field: {field}")
+        return {"field": field, "suggestion": get_random_suggestion(field, samplers=self.samplers)}
+
+    def stories(self, query):
+        if self.store is None:
+            raise HTTPError(404, "No story store")
+        # The desktop app may be saving to the same store
+        if self.store.refresh():
+            self.page_marks.clear()
+        theme = query.get("theme", [""])[0] or None
+        if theme is not None and theme not in THEMES:
+            raise HTTPError(400, f"Unknown theme: {theme}")
+        try:
+            page = int(query.get("page", ["1"])[0])
+        except ValueError:
+            raise HTTPError(400, "page must be a number") from None
+        if page < 1:
+            raise HTTPError(400, "page starts at 1")
+
+        # Walk from the nearest page already seen; the store pages by id, not offset
+        start = page
+        while start > 1 and (theme, start) not in self.page_marks:
+            start -= 1
+        before_id = self.page_marks.get((theme, start))
+        for number in range(start, page + 1):
+            self.page_marks[(theme, number)] = before_id
+            stories = self.store.query(theme, PAGE_SIZE, before_id)
+            if len(stories) < PAGE_SIZE:
+                break
+            before_id = stories[-1]["id"]
+        if number < page:
+            stories = []
+        return {
+            "theme": theme,
+            "page": page,
+            "stories": stories,
+            "next_page": page + 1 if len(stories) == PAGE_SIZE else None,
+        }
+
+async def read_request(reader):
+    """(method, target, headers, body) for the next request, or None once the client is done"""
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    try:
+        method, target, _version = request_line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(400, "Malformed request line") from None
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        if len(headers) >= MAX_HEADERS:
+            raise HTTPError(400, "Too many headers")
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise HTTPError(400, "Bad Content-Length") from None
+    if length > MAX_BODY:
+        raise HTTPError(413, f"Body is over {MAX_BODY} bytes")
+    body = await reader.readexactly(length) if length > 0 else b""
+    return method.upper(), target, headers, body
+
+async def serve_connection(service, reader, writer):
+    try:
+        while True:
+            try:
+                request = await asyncio.wait_for(read_request(reader), IDLE_TIMEOUT)
+            except HTTPError as e:
+                writer.write(encode_response(e.status, {"error": str(e)}, keep_alive=False))
+                break
+            if request is None:
+                break
+            method, target, headers, body = request
+            keep_alive = headers.get("connection", "").lower() != "close"
+            if method == "OPTIONS":
+                # CORS preflight for browser front ends on another port
+                writer.write(encode_response(204, keep_alive=keep_alive, headers=(
+                    "Access-Control-Allow-Methods: GET, POST, OPTIONS",
+                    "Access-Control-Allow-Headers: Content-Type",
+                )))
+            else:
+                url = urlsplit(target)
+                try:
+                    status, payload = await service.handle_async(method, url.path, parse_qs(url.query), body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except Exception as e:
+                    print(f"⚠️ Error answering {method} {target}: {e}")
+                    status, payload = 500, {"error": "Internal error"}
+                writer.write(encode_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+async def serve(service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    server = await asyncio.start_server(
+        lambda reader, writer: serve_connection(service, reader, writer), host, port, backlog=1024
+    )
+    print(f"🌐 Serving stories on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+def run_server(store=None, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Serve until interrupted (Ctrl+C)"""
+    try:
+        asyncio.run(serve(StoryService(store), host, port))
+    except KeyboardInterrupt:
+        print("👋 Server stopped")
@@ -0,0 +1,69 @@
+"""Text clean-up before speech synthesis"""
+import re
+
+# Text-speak that TTS engines mispronounce, and what to say instead
+SPEECH_SUBSTITUTIONS = {
+    "WiFi": "Wi-Fi",
+    "TikTok": "Tick Tock",
+}
+
+# Emojis and any other symbols the voice can't say
+_UNSPEAKABLE = re.compile(r"[^\w\s.,!?;:'-]+")
+# Runs of characters outside the plain ASCII speakable set. Scanning for these is much cheaper
+# than testing every character against \w and \s; only the runs found are
+# checked with _UNSPEAKABLE (they may hold accented letters or tabs to keep).
+_SYMBOL_CANDIDATES = re.compile(r"[^A-Za-z0-9_ \n.,!?;:'-]+")
+# Excessive formatting like long runs of dashes ('=' is already unspeakable)
+_DASH_RUNS = re.compile(r"-{3,}")
+_HASHTAGS = re.compile(r"#\w+")
+
+def _strip_unspeakable(match):
+    return _UNSPEAKABLE.sub("", match.group())
+
+def _newlines_to_pauses(text):
+    """Turn every run of newlines into '. ' (like re.sub(r'\n+', '. ', text), but faster)"""
+    lines = text.split("\n")
+    parts = [line for line in lines if line]
+    if not parts:
+        return ". "
+    text = ". ".join(parts)
+    if not lines[0]:
+        text = ". " + text
+    if not lines[-1]:
+        text += ". "
+    return text
+
+class SpeechNormalizer:
+    """Cleans story text for TTS in as few passes over the text as possible.
+
+    Patterns are compiled once. Symbols and emojis are stripped in one
+    regex pass, newlines become pauses and whitespace collapses with
+    str.split/join, and substitutions are applied in table order. Steps
+    that can't change the text (no dashes, no newlines, a substitution
+    that doesn't occur) are skipped.
+    """
+
+    def __init__(self, substitutions=SPEECH_SUBSTITUTIONS, drop_hashtags=False):
+        self.substitutions = tuple(substitutions.items())
+        self.drop_hashtags = drop_hashtags
+
+    def __call__(self, text):
+        # By default '#' goes with the other symbols and the tag word is kept
+        if self.drop_hashtags and "#" in text:
+            text = _HASHTAGS.sub("", text)
+        text = _SYMBOL_CANDIDATES.sub(_strip_unspeakable, text)
+        if "---" in text:
+            text = _DASH_RUNS.sub("", text)
+        if "\n" in text:
+            text = _newlines_to_pauses(text)
+        text = " ".join(text.split())
+        for written, spoken in self.substitutions:
+            if written in text:
+                text = text.replace(written, spoken)
+        return text
+
+_default_normalizer = SpeechNormalizer()
+
+def clean_text_for_speech(text):
+    """Remove emojis, excessive formatting, and clean text for better TTS"""
+    return _default_normalizer(text)
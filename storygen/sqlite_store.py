@@ -0,0 +1,232 @@
+"""Saved story storage in SQLite"""
+import json
+import sqlite3
+import threading
+from itertools import islice
+from pathlib import Path
+
+from .store import STORIES_FILE, StoryStore, new_record, render_stored, renders_as, text_hash
+
+DATABASE_FILE = "saved_stories.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stories (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    theme TEXT NOT NULL,
+    text_hash TEXT,
+    template TEXT,
+    inputs TEXT
+);
+CREATE TABLE IF NOT EXISTS texts (
+    hash TEXT PRIMARY KEY,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS stories_theme_id ON stories (theme, id);
+CREATE INDEX IF NOT EXISTS stories_timestamp ON stories (timestamp);
+"""
+
+# Databases from before texts were content-addressed kept each story's text in
+# the stories table; it is rebuilt with the texts moved out, one copy each
+MIGRATE_TEXTS = """
+INSERT OR IGNORE INTO texts (hash, text) SELECT text_hash(story), story FROM stories;
+CREATE TABLE stories_new (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    theme TEXT NOT NULL,
+    text_hash TEXT,
+    template TEXT,
+    inputs TEXT
+);
+INSERT INTO stories_new (id, timestamp, theme, text_hash, inputs)
+    SELECT id, timestamp, theme, text_hash(story), inputs FROM stories;
+DROP TABLE stories;
+ALTER TABLE stories_new RENAME TO stories;
+CREATE INDEX stories_theme_id ON stories (theme, id);
+CREATE INDEX stories_timestamp ON stories (timestamp);
+"""
+
+# Statements are kept constant so sqlite3's statement cache reuses them
+INSERT_STORY = "INSERT INTO stories (id, timestamp, theme, text_hash, template, inputs) VALUES (?, ?, ?, ?, ?, ?)"
+INSERT_TEXT = "INSERT OR IGNORE INTO texts (hash, text) VALUES (?, ?)"
+STORY_COLUMNS = (
+    "SELECT s.id, s.timestamp, s.theme, t.text, s.template, s.inputs FROM stories s "
+    "LEFT JOIN texts t ON t.hash = s.text_hash"
+)
+SELECT_STORY = STORY_COLUMNS + " WHERE s.id = ?"
+SELECT_ALL = STORY_COLUMNS + " ORDER BY s.id"
+SELECT_LATEST = STORY_COLUMNS + " WHERE s.id < ? ORDER BY s.id DESC LIMIT ?"
+SELECT_LATEST_THEME = STORY_COLUMNS + " WHERE s.theme = ? AND s.id < ? ORDER BY s.id DESC LIMIT ?"
+COUNT_STORIES = "SELECT COUNT(*) FROM stories"
+MAX_ID = "SELECT MAX(id) FROM stories"
+DATA_VERSION = "PRAGMA data_version"
+
+# Larger than any story id, for "latest" queries without a before_id
+NO_LIMIT_ID = 2**63 - 1
+
+# Records converted to rows at a time by import_stories
+IMPORT_BATCH = 10000
+
+def row_to_story(row):
+    story_id, timestamp, theme, text, template, inputs = row
+    inputs = json.loads(inputs) if inputs else None
+    if template is not None:
+        text = render_stored(template, inputs)
+    story_data = {"id": story_id, "timestamp": timestamp, "theme": theme, "story": text}
+    if inputs:
+        story_data["inputs"] = inputs
+    if template is not None:
+        story_data["template"] = template
+    return story_data
+
+def story_to_row(story_data):
+    """The stories row for a record, and its texts row (None if saved as template + words)"""
+    inputs = story_data.get("inputs")
+    template = story_data.get("template")
+    text_row = None if template is not None else (text_hash(story_data["story"]), story_data["story"])
+    story_row = (
+        story_data["id"],
+        story_data["timestamp"],
+        story_data["theme"],
+        None if text_row is None else text_row[0],
+        template,
+        json.dumps(inputs, ensure_ascii=False) if inputs else None,
+    )
+    return story_row, text_row
+
+class SQLiteStoryStore:
+    """Saved stories in an indexed SQLite database (WAL mode).
+
+    Same interface as StoryStore, but nothing is held in memory: lookups
+    and pages are answered by the database. An empty database is seeded
+    from the JSON Lines journal (or legacy JSON file) on first load. Texts
+    are content-addressed in their own table, as in the journal.
+
+    A read_only store opens an existing database without creating,
+    upgrading or seeding it.
+    """
+
+    def __init__(self, path=DATABASE_FILE, import_from=STORIES_FILE, inputs_only=False, read_only=False):
+        self.path = path
+        self.import_from = import_from
+        self.inputs_only = inputs_only
+        self.read_only = read_only
+        self.lock = threading.Lock()
+        self.conn = None
+        self.count = 0
+        self.last_id = 0
+        # Changes when another connection commits, so refresh() only recounts then
+        self.data_version = None
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        # A separate cursor streams rows without loading the whole table
+        cursor = self.conn.execute(SELECT_ALL)
+        for row in cursor:
+            yield row_to_story(row)
+
+    def load(self):
+        """Open the database, creating and seeding it if needed"""
+        if self.read_only:
+            return self._load_read_only()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.create_function("text_hash", 1, text_hash, deterministic=True)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._upgrade_schema()
+        self._refresh_counts()
+        if not self.count and self.import_from:
+            existing = StoryStore(self.import_from).load()
+            if existing:
+                self.import_stories(existing)
+        return self
+
+    def _load_read_only(self):
+        # mode=ro fails on a missing file instead of creating an empty database
+        uri = Path(self.path).resolve().as_uri() + "?mode=ro"
+        self.conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(stories)")}
+        if "story" in columns or "text_hash" not in columns:
+            self.close()
+            raise sqlite3.OperationalError(f"{self.path} is from an older version; open it with the app once to upgrade it")
+        self._refresh_counts()
+        return self
+
+    def _upgrade_schema(self):
+        # Databases created before stories kept their inputs lack that column
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(stories)")}
+        if "inputs" not in columns:
+            self.conn.execute("ALTER TABLE stories ADD COLUMN inputs TEXT")
+        if "story" in columns:
+            self.conn.executescript("BEGIN;" + MIGRATE_TEXTS + "COMMIT;")
+            # Hand the space the duplicate texts took back to the file system
+            self.conn.execute("VACUUM")
+
+    def _refresh_counts(self):
+        self.data_version = self.conn.execute(DATA_VERSION).fetchone()[0]
+        self.count = self.conn.execute(COUNT_STORIES).fetchone()[0]
+        self.last_id = self.conn.execute(MAX_ID).fetchone()[0] or 0
+
+    def import_stories(self, stories):
+        """Bulk insert existing story records in one transaction"""
+        stories = iter(stories)
+        with self.lock, self.conn:
+            # In batches, so a large import is never held in memory twice
+            while batch := [story_to_row(story_data) for story_data in islice(stories, IMPORT_BATCH)]:
+                self.conn.executemany(INSERT_TEXT, [text_row for _, text_row in batch if text_row is not None])
+                self.conn.executemany(INSERT_STORY, [story_row for story_row, _ in batch])
+        self._refresh_counts()
+
+    def get(self, story_id):
+        """Return the story with this id, or None"""
+        row = self.conn.execute(SELECT_STORY, (story_id,)).fetchone()
+        return row_to_story(row) if row else None
+
+    def query(self, theme=None, limit=50, before_id=None):
+        """Newest stories first, optionally for one theme and older than before_id"""
+        before_id = NO_LIMIT_ID if before_id is None else before_id
+        if theme is None:
+            rows = self.conn.execute(SELECT_LATEST, (before_id, limit))
+        else:
+            rows = self.conn.execute(SELECT_LATEST_THEME, (theme, before_id, limit))
+        return [row_to_story(row) for row in rows]
+
+    def next_id(self):
+        return self.last_id + 1
+
+    def refresh(self):
+        """Catch up on stories other processes have saved; True if there were any"""
+        # COUNT(*) scans the table, so it is only run once something has changed
+        if self.conn.execute(DATA_VERSION).fetchone()[0] == self.data_version:
+            return False
+        count, last_id = self.count, self.last_id
+        self._refresh_counts()
+        return (count, last_id) != (self.count, self.last_id)
+
+    def add(self, theme, story, inputs=None, template=None):
+        """Save a new story and return its record.
+
+        inputs are the words the story was made from and template the id of
+        its template, if known.
+        """
+        with self.lock:
+            # A NULL id lets SQLite pick the next one, even with other processes writing
+            story_data = new_record(None, theme, story, inputs)
+            if self.inputs_only and renders_as(template, inputs, story):
+                story_data["template"] = template
+            story_row, text_row = story_to_row(story_data)
+            with self.conn:
+                if text_row is not None:
+                    self.conn.execute(INSERT_TEXT, text_row)
+                story_data["id"] = self.conn.execute(INSERT_STORY, story_row).lastrowid
+            self.last_id = max(self.last_id, story_data["id"])
+            self.count += 1
+        return story_data
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
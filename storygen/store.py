@@ -0,0 +1,421 @@
+"""Saved story storage"""
+import bisect
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import chain
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+from .templates import template_library
+
+STORIES_FILE = "saved_stories.jsonl"
+LEGACY_STORIES_FILE = "saved_stories.json"
+
+# Compact the journal on load once this share of its lines is dead weight
+# (records superseded by a later line with the same id)
+COMPACT_RATIO = 0.25
+
+# Once the journal is bigger than this (bytes), all but its newest
+# KEEP_IN_JOURNAL stories are rolled into the compressed archive on load
+ARCHIVE_THRESHOLD = 16 * 1024 * 1024
+KEEP_IN_JOURNAL = 1000
+
+# Held by whichever process is writing the journal (the desktop app and `serve` may share it)
+LOCK_SUFFIX = ".lock"
+
+# Shown in place of a story saved as template + words whose template is gone
+MISSING_TEMPLATE_STORY = "⚠️ This story's template is no longer installed."
+
+def encode_record(story_data):
+    """One journal line for a story record"""
+    return json.dumps(story_data, ensure_ascii=False) + "\n"
+
+def text_hash(text):
+    """The content address of a story's text"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+def stored_form(story_data, **fields):
+    """A record as written to disk, without its text but with fields (e.g. ref=hash)"""
+    stored = {key: value for key, value in story_data.items() if key != "story"}
+    stored.update(fields)
+    return stored
+
+_missing_templates = set()
+
+def render_stored(template_id, inputs):
+    """Re-render a story saved as template + words"""
+    template = template_library.find(template_id)
+    if template is None or not inputs or not template.fields <= inputs.keys():
+        if template_id not in _missing_templates:
+            _missing_templates.add(template_id)
+            print(f"⚠️ Template {template_id} of a saved story is no longer installed")
+        return MISSING_TEMPLATE_STORY
+    return template.render(inputs)
+
+def renders_as(template_id, inputs, story):
+    """Whether the template, given these words, renders exactly this story"""
+    template = template_library.find(template_id) if template_id else None
+    return template is not None and bool(inputs) and template.fields <= inputs.keys() and template.render(inputs) == story
+
+def lock_file(f):
+    """Block until this process holds an exclusive lock on the open file f"""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        return
+    f.seek(0)
+    while True:
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            # LK_LOCK gives up after about 10 seconds; keep waiting
+            continue
+
+def unlock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def file_identity(stat):
+    """Changes when the file is replaced (compacted or rolled), not when it is appended to"""
+    return stat.st_dev, stat.st_ino
+
+def new_record(story_id, theme, story, inputs=None):
+    """A saved-story record stamped with the current time"""
+    story_data = {
+        "id": story_id,
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "theme": theme,
+        "story": story
+    }
+    if inputs:
+        story_data["inputs"] = dict(inputs)
+    return story_data
+
+class StoryStore:
+    """Saved stories backed by an append-only JSON Lines journal.
+
+    Saving a story appends a single line, so it costs the same no matter
+    how many stories are already saved. A legacy ``saved_stories.json``
+    array is migrated into the journal the first time it is loaded.
+
+    Story text is content-addressed: a text is written in full, with its
+    ``"hash"``, only by the first record that has it, and later records
+    with the same text point at it with ``"ref"``, so saving a duplicate
+    only adds its id, timestamp and words.
+    With inputs_only, a generated story is saved as just its template id
+    and words (``"template"``) and rendered again on load.
+
+    Older stories live in a compressed archive next to the journal (see
+    storygen.archive); only the journal's stories are held in memory.
+
+    Several processes may share a journal (the desktop app and ``serve``).
+    Every write happens under a lock file, after reading whatever the
+    others appended since, so each story gets its own id.
+
+    A read_only store never migrates, compacts or rolls anything on load,
+    for commands that only look at saved stories.
+    """
+
+    def __init__(self, path=STORIES_FILE, legacy_path=LEGACY_STORIES_FILE, inputs_only=False,
+                 archive_threshold=ARCHIVE_THRESHOLD, read_only=False):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.inputs_only = inputs_only
+        self.read_only = read_only
+        self.archive_threshold = archive_threshold
+        self.archive = None
+        self.stories = []
+        # text hash -> text, for every text written to the journal
+        self.texts = {}
+        # How far the journal has been read, and which file that was
+        self.offset = 0
+        self.identity = None
+        self.thread_lock = threading.RLock()
+        self.held_lock = None
+
+    def __len__(self):
+        return len(self.stories) + (len(self.archive) if self.archive is not None else 0)
+
+    def __iter__(self):
+        if self.archive is None:
+            return iter(self.stories)
+        return chain(self.archive, self.stories)
+
+    def get(self, story_id):
+        """Return the story with this id, or None"""
+        i = bisect.bisect_left(self.stories, story_id, key=lambda story: story["id"])
+        if i < len(self.stories) and self.stories[i]["id"] == story_id:
+            return self.stories[i]
+        if self.archive is not None and story_id <= self.archive.last_id:
+            return self.archive.get(story_id)
+        return None
+
+    def query(self, theme=None, limit=50, before_id=None):
+        """Newest stories first, optionally for one theme and older than before_id"""
+        end = len(self.stories)
+        if before_id is not None:
+            end = bisect.bisect_left(self.stories, before_id, key=lambda story: story["id"])
+        results = []
+        for i in range(end - 1, -1, -1):
+            if len(results) >= limit:
+                break
+            story_data = self.stories[i]
+            if theme is None or story_data["theme"] == theme:
+                results.append(story_data)
+        # Every archived story is older than the journal's
+        if len(results) < limit and self.archive is not None:
+            results.extend(self.archive.query(theme, limit - len(results), before_id))
+        return results
+
+    def next_id(self):
+        if self.stories:
+            return self.stories[-1]["id"] + 1
+        return self.archive.last_id + 1 if self.archive is not None else 1
+
+    @contextmanager
+    def locked(self):
+        """Hold the journal's lock file; other threads and processes wait their turn"""
+        with self.thread_lock:
+            if self.held_lock is not None:
+                # Already held further up this thread's stack
+                yield
+                return
+            with open(self.path + LOCK_SUFFIX, "a+b") as f:
+                lock_file(f)
+                self.held_lock = f
+                try:
+                    yield
+                finally:
+                    self.held_lock = None
+                    unlock_file(f)
+
+    def load(self):
+        """Read saved stories from disk (an empty store if nothing is saved yet)"""
+        with self.locked():
+            if not os.path.exists(self.path):
+                self._read_all()
+                self.stories = self._read_legacy()
+                if self.stories and not self.read_only:
+                    self.compact()
+                    self._roll_if_large()
+                return self
+
+            lines, damaged, inline_texts, archived = self._read_all()
+            if self.read_only:
+                return self
+            # Rewrite damaged journals straight away so the next append starts on a clean line
+            if damaged or inline_texts or archived or lines - len(self.stories) > lines * COMPACT_RATIO:
+                self.compact()
+            self._roll_if_large()
+        return self
+
+    def refresh(self):
+        """Pick up stories other processes have saved since the journal was last read; True if there were any"""
+        with self.locked():
+            return self._catch_up()
+
+    def _read_all(self):
+        """Read the archive index and the whole journal.
+
+        Returns (record lines, damaged, inline texts, archived) so load()
+        can decide whether the journal needs rewriting.
+        """
+        from .archive import StoryArchive, archive_path_for
+        self.archive = StoryArchive(archive_path_for(self.path)).load()
+        self.texts = {}
+        self.stories = []
+        self.offset = 0
+        self.identity = None
+        if not os.path.exists(self.path):
+            return 0, False, False, 0
+        with open(self.path, "rb") as f:
+            records, damaged, inline_texts = self._read_records(f, self.texts)
+            self.offset = f.tell()
+            self.identity = file_identity(os.fstat(f.fileno()))
+        by_id = {story_data["id"]: story_data for story_data in records}
+        self.stories = sorted(by_id.values(), key=lambda story: story["id"])
+
+        # Stories already rolled into the archive by a roll that was cut short
+        archived = bisect.bisect_right(self.stories, self.archive.last_id, key=lambda story: story["id"])
+        if archived:
+            del self.stories[:archived]
+        return len(records), damaged, inline_texts, archived
+
+    def _read_records(self, f, texts):
+        """Records from f's position to the end of the journal: (records, damaged, inline texts)"""
+        records = []
+        damaged = False
+        # Journals written before stories were content-addressed hold full texts
+        inline_texts = False
+        for line in f:
+            # A line without its newline was cut off mid-write
+            damaged = damaged or not line.endswith(b"\n")
+            try:
+                story_data = json.loads(line)
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                print(f"⚠️ Skipping damaged line in {self.path}")
+                damaged = True
+                continue
+            if "hash" in story_data:
+                texts[story_data.pop("hash")] = story_data["story"]
+            elif "ref" in story_data:
+                text = texts.get(story_data.pop("ref"))
+                if text is None:
+                    print(f"⚠️ Skipping story #{story_data['id']}, its text is missing from {self.path}")
+                    damaged = True
+                    continue
+                story_data["story"] = text
+            elif "template" in story_data:
+                story_data["story"] = render_stored(story_data["template"], story_data.get("inputs"))
+            else:
+                inline_texts = True
+            records.append(story_data)
+        return records, damaged, inline_texts
+
+    def _catch_up(self):
+        """Read what other processes wrote to the journal (call with the lock held); True if anything changed"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        if file_identity(stat) != self.identity or stat.st_size < self.offset:
+            # Another process compacted the journal or rolled it into the archive
+            self._read_all()
+            return True
+        if stat.st_size == self.offset:
+            return False
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            records, _, _ = self._read_records(f, self.texts)
+            self.offset = f.tell()
+        for story_data in records:
+            if not self.stories or story_data["id"] > self.stories[-1]["id"]:
+                self.stories.append(story_data)
+                continue
+            i = bisect.bisect_left(self.stories, story_data["id"], key=lambda story: story["id"])
+            if i < len(self.stories) and self.stories[i]["id"] == story_data["id"]:
+                self.stories[i] = story_data
+            else:
+                self.stories.insert(i, story_data)
+        return True
+
+    def _roll_if_large(self):
+        if (self.archive_threshold is not None and len(self.stories) > KEEP_IN_JOURNAL
+                and os.path.getsize(self.path) > self.archive_threshold):
+            self.roll()
+
+    def roll(self, keep=KEEP_IN_JOURNAL):
+        """Move all but the newest keep stories from the journal into the archive; returns how many moved"""
+        with self.locked():
+            self._catch_up()
+            rolled = self.stories[:max(0, len(self.stories) - keep)]
+            if not rolled:
+                return 0
+            # Archive first: if the journal rewrite is cut short, load() drops the copies
+            self.archive.append(rolled)
+            self.stories = self.stories[len(rolled):]
+            self.compact()
+        return len(rolled)
+
+    def _read_legacy(self):
+        """The legacy file's stories in id order.
+
+        The file may have been edited by hand, so a story whose id is
+        missing or already taken gets a new id after the highest one
+        rather than being dropped (the journal keeps one story per id).
+        """
+        try:
+            with open(self.legacy_path, "r", encoding="utf-8") as f:
+                stories = json.load(f)
+        except FileNotFoundError:
+            return []
+        stories.sort(key=lambda story: story["id"] if isinstance(story.get("id"), int) else float("inf"))
+        next_id = max([story["id"] for story in stories if isinstance(story.get("id"), int)], default=0) + 1
+        seen = set()
+        for story_data in stories:
+            if not isinstance(story_data.get("id"), int) or story_data["id"] in seen:
+                print(f"⚠️ Story #{story_data.get('id')} in {self.legacy_path} is saved as #{next_id}")
+                story_data["id"] = next_id
+                next_id += 1
+            seen.add(story_data["id"])
+        return stories
+
+    def add(self, theme, story, inputs=None, template=None):
+        """Save a new story and return its record.
+
+        inputs are the words the story was made from and template the id of
+        its template, if known.
+        """
+        with self.locked():
+            # Another process may have saved stories since: their ids are taken
+            self._catch_up()
+            story_data = new_record(self.next_id(), theme, story, inputs)
+            if self.inputs_only and renders_as(template, inputs, story):
+                story_data["template"] = template
+                lines = encode_record(stored_form(story_data))
+            else:
+                lines = self._encode_text_record(story_data, self.texts)
+            with open(self.path, "a+b") as f:
+                # Start on a fresh line if a crashed writer left a partial one
+                if f.seek(0, os.SEEK_END) and (f.seek(-1, os.SEEK_END), f.read(1))[1] != b"\n":
+                    lines = "\n" + lines
+                f.write(lines.encode("utf-8"))
+                self.offset = f.tell()
+                self.identity = file_identity(os.fstat(f.fileno()))
+            self.stories.append(story_data)
+        return story_data
+
+    def _encode_text_record(self, story_data, texts):
+        """The journal line for a record: with its text if texts doesn't have it yet, else a reference to it"""
+        key = text_hash(story_data["story"])
+        if key not in texts:
+            texts[key] = story_data["story"]
+            return encode_record({**story_data, "hash": key})
+        # Duplicates share one string in memory too
+        story_data["story"] = texts[key]
+        return encode_record(stored_form(story_data, ref=key))
+
+    def compact(self):
+        """Rewrite the journal with one line per live story, each distinct text written out once"""
+        with self.locked():
+            texts = {}
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for story_data in self.stories:
+                    if "template" in story_data:
+                        f.write(encode_record(stored_form(story_data)))
+                        continue
+                    f.write(self._encode_text_record(story_data, texts))
+            os.replace(tmp_path, self.path)
+            self.texts = texts
+            stat = os.stat(self.path)
+            self.offset = stat.st_size
+            self.identity = file_identity(stat)
+
+def open_store(backend="jsonl", inputs_only=False, read_only=False):
+    """Open and load the saved-story store for the given backend ("jsonl" or "sqlite").
+
+    read_only leaves the files as they are: no migration, compaction or
+    rolling into the archive, and no database is created, upgraded or seeded.
+    """
+    if backend == "sqlite":
+        from .sqlite_store import DATABASE_FILE, SQLiteStoryStore
+        if read_only and not os.path.exists(DATABASE_FILE):
+            # Not created until the app first opens it: the stories are still in the journal
+            print(f"⚠️ No {DATABASE_FILE} yet, reading {STORIES_FILE}")
+            return StoryStore(read_only=True).load()
+        return SQLiteStoryStore(inputs_only=inputs_only, read_only=read_only).load()
+    if backend == "jsonl":
+        return StoryStore(inputs_only=inputs_only, read_only=read_only).load()
+    raise ValueError(f"Unknown story store backend: {backend}")
@@ -0,0 +1,100 @@
+"""Theme roles for widgets, so a theme switch only touches what subscribed to it"""
+import tkinter as tk
+from tkinter import font as tkfont
+from tkinter import ttk
+
+TITLE_SIZE = 18
+
+# ttk theme whose frames, labels and buttons take their colours from styles
+TTK_THEME = "clam"
+
+# ttk style and its options for each role, given a theme's config and its fonts.
+# Every widget of a role shares its style, so a theme switch is one configure per role.
+STYLE_ROLES = {
+    "frame": ("Story.TFrame", lambda theme, fonts: {"background": theme["bg"]}),
+    "title": ("Title.Story.TLabel", lambda theme, fonts: {
+        "background": theme["bg"], "foreground": theme["text"], "font": fonts["title"]}),
+    "label": ("Story.TLabel", lambda theme, fonts: {
+        "background": theme["bg"], "foreground": theme["text"], "font": fonts["body"]}),
+    "button": ("Story.TButton", lambda theme, fonts: {
+        "background": theme["button"], "foreground": "white", "font": fonts["body"], "padding": (10, 4)}),
+    "accent_button": ("Accent.Story.TButton", lambda theme, fonts: {
+        "background": theme["accent"], "foreground": theme["text"], "font": ("Arial", 10), "padding": (2, 2)}),
+}
+
+# Buttons lighten to the theme's accent under the pointer
+STYLE_MAPS = {
+    "button": lambda theme: {"background": [("disabled", theme["bg"]), ("active", theme["accent"])]},
+    "accent_button": lambda theme: {"background": [("active", theme["button"])]},
+}
+
+# Classic Tk widgets with no ttk counterpart (windows, Text) are set one by one
+WIDGET_ROLES = {
+    "window": lambda theme, fonts: {"bg": theme["bg"]},
+    "text": lambda theme, fonts: {"bg": theme["bg"], "fg": theme["text"], "insertbackground": theme["text"]},
+}
+
+class StyleRegistry:
+    """Theme roles shared by widgets across every window.
+
+    Frames, labels and buttons are ttk widgets with one style per role,
+    and fonts are named Tk fonts, so apply() is a call per role however
+    many widgets there are. Only windows and Text widgets, which ttk
+    can't style, are subscribed and updated one by one; destroyed
+    widgets unsubscribe themselves.
+    """
+
+    def __init__(self, theme_config):
+        self.theme = theme_config
+        self.fonts = None
+        self.ttk_style = None
+        self.widgets = {}
+
+    def _start(self):
+        # Named fonts and ttk styles need a Tk root, so they are made with the first widget
+        family, size = self.theme["font"]
+        self.fonts = {
+            "body": tkfont.Font(family=family, size=size),
+            "title": tkfont.Font(family=family, size=TITLE_SIZE, weight="bold"),
+        }
+        self.ttk_style = ttk.Style()
+        self.ttk_style.theme_use(TTK_THEME)
+        self._configure_styles()
+
+    def _configure_styles(self):
+        for name, spec in STYLE_ROLES.values():
+            self.ttk_style.configure(name, **spec(self.theme, self.fonts))
+        for role, spec in STYLE_MAPS.items():
+            self.ttk_style.map(STYLE_ROLES[role][0], **spec(self.theme))
+
+    def style(self, widget, role):
+        """Give widget a role, styled for the current theme, and return it (ttk widgets for style roles)"""
+        if self.fonts is None:
+            self._start()
+        if role in STYLE_ROLES:
+            widget.configure(style=STYLE_ROLES[role][0])
+            return widget
+        self.widgets[str(widget)] = (widget, role)
+        widget.bind("<Destroy>", self._forget, add="+")
+        widget.config(**WIDGET_ROLES[role](self.theme, self.fonts))
+        return widget
+
+    def _forget(self, event):
+        self.widgets.pop(str(event.widget), None)
+
+    def apply(self, theme_config):
+        """Switch every role to theme_config"""
+        self.theme = theme_config
+        if self.fonts is None:
+            return
+        family, size = theme_config["font"]
+        self.fonts["body"].configure(family=family, size=size)
+        self.fonts["title"].configure(family=family)
+        self._configure_styles()
+        options = {role: spec(theme_config, self.fonts) for role, spec in WIDGET_ROLES.items()}
+        for widget, role in list(self.widgets.values()):
+            try:
+                widget.config(**options[role])
+            except tk.TclError:
+                # Destroyed before its <Destroy> handler ran
+                self.widgets.pop(str(widget), None)
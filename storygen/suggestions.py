@@ -0,0 +1,29 @@
+"""Silly word suggestions for the story fields"""
+import random
+
+from .wordbank import word_banks
+
+SILLY_SUGGESTIONS = {
+    "place": ["Timbuktu", "Your Bathroom", "McDonald's", "Mars", "Under Your Bed", "Netflix Headquarters"],
+    "adjective": ["Wiggly", "Stinky", "Magnificent", "Ridiculous", "Sneaky", "Legendary"],
+    "noun": ["Pickle", "Unicorn", "Toothbrush", "Dinosaur", "Pizza Slice", "Rubber Duck"],
+    "verb": ["Danced", "Burped", "Teleported", "Giggled", "Snorted", "Wobbled"],
+    "adverb": ["Awkwardly", "Majestically", "Suspiciously", "Dramatically", "Frantically", "Sleepily"],
+    "name": ["Captain Cheese", "Sir Snuggles", "Princess Pickles", "Doctor Giggles", "Master Muffin"]
+}
+
+def get_random_suggestion(field, rng=random, samplers=None):
+    """A random word for the field, from its word bank if one is installed.
+
+    With samplers (a SamplerSet), recently suggested words are not repeated.
+    """
+    words = word_banks.get(field)
+    if words is None:
+        words = SILLY_SUGGESTIONS[field]
+    if samplers is None:
+        return rng.choice(words)
+    return words[samplers.draw(f"field:{field}", len(words), rng)]
+
+def random_inputs(rng=random, samplers=None):
+    """Pick a random silly word for every story field"""
+    return {field: get_random_suggestion(field, rng, samplers) for field in SILLY_SUGGESTIONS}
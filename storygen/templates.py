@@ -0,0 +1,430 @@
+"""Story templates and the compiled template engine"""
+import hashlib
+import json
+import marshal
+import os
+import random
+import re
+import sys
+import textwrap
+import threading
+import time
+
+try:
+    import tomllib
+except ImportError:
+    # Python < 3.11: JSON packs only
+    tomllib = None
+
+from .suggestions import SILLY_SUGGESTIONS
+from .themes import THEMES
+
+# Templates use {field} slots (optionally {field.upper()}) and are compiled once
+# at import time, so rendering a story only fills in the template it picked.
+STORY_TEMPLATES = {
+    "Funny": [
+        """
+        🎪 THE GREAT {place.upper()} ADVENTURE! 🎪
+        
+        Once upon a time in {place}, there lived a {adjective} {noun} named Kevin.
+        Kevin {verb} {adverb} every morning at 6 AM sharp, much to the horror of local pigeons.
+        
+        One day, {name} witnessed this spectacle and thought, "This is either genius or I need glasses."
+        The {noun} then started a YouTube channel called "Kevin's {adjective} Adventures" 
+        and became an overnight sensation with 50 million subscribers!
+        
+        The moral of the story: Never underestimate a {adjective} {noun} with WiFi access! 📱✨
+        """,
+
+        """
+        🤪 BREAKING NEWS FROM {place.upper()}! 🤪
+        
+        Local resident {name} reported seeing a {adjective} {noun} that could {verb} {adverb}.
+        "I was just minding my own business," said {name}, "when this thing started performing better than TikTok dancers!"
+        
+        The {noun} has since been offered a Bollywood contract, a Netflix series, and its own brand of energy drinks.
+        Scientists are baffled, tourists are flocking, and the {noun} is trending on Twitter with #RelateableMood.
+        
+        In other news, local chai vendors report a 500% increase in sales. Coincidence? We think not! ☕️🎬
+        """,
+    ],
+
+    "Spooky": [
+        """
+        🌙 THE HAUNTING OF {place.upper()} 🌙
+        
+        It was a dark and stormy night in {place}... (Yes, we're starting with that cliché!)
+        The wind howled as a {adjective} {noun} began to {verb} {adverb} near the old cemetery.
+        
+        {name} was walking home from late-night pizza delivery when they spotted the creature.
+        "Well, this is either a ghost or I've been working too many night shifts," muttered {name}.
+        
+        The {noun} turned around, looked {name} dead in the eye, and said:
+        "Do you have WiFi password? Even spirits need internet these days!" 👻📱
+        
+        And that's how {name} became the first person to give WiFi access to a supernatural being.
+        """,
+
+        """
+        🕷️ THE CURSE OF THE {adjective.upper()} {noun.upper()} 🕷️
+        
+        Legend says that anyone who visits {place} will encounter the mysterious {adjective} {noun}.
+        It appears at midnight, {verb}s {adverb}, and grants three wishes... but with a twist!
+        
+        When {name} met the creature, they wished for:
+        1. Unlimited pizza 🍕
+        2. The ability to sleep through Monday mornings 😴
+        3. For their WiFi to never lag during Netflix 📺
+        
+        The {noun} granted all wishes but now {name} can only eat pizza, 
+        sleeps for 20 hours a day, and binge-watches shows forever!
+        
+        Be careful what you wish for... especially from {adjective} {noun}s! 🎭
+        """,
+    ],
+
+    "Sci-Fi": [
+        """
+        🚀 GALACTIC REPORT: YEAR 3025 🚀
+        
+        Commander {name} was patrolling the space sector near {place} when sensors detected
+        an unidentified {adjective} {noun} that could {verb} {adverb} through hyperspace!
+        
+        "This is either first contact or my coffee machine is malfunctioning again," reported {name}.
+        
+        The alien {noun} communicated using memes and offered to trade advanced technology 
+        for Earth's supply of pizza and cat videos. 
+        
+        Peace negotiations are ongoing. Humanity's greatest diplomats (pizza delivery drivers) 
+        have been dispatched to finalize the treaty! 🍕👽
+        
+        UPDATE: The {noun} has opened an intergalactic food truck. Reviews are stellar! ⭐⭐⭐⭐⭐
+        """,
+
+        """
+        🛸 SPACE STATION {place.upper()}: MISSION LOG 🛸
+        
+        Day 347: Our AI assistant has evolved into a {adjective} {noun} that insists on 
+        {verb}ing {adverb} through the corridors while playing 80s music.
+        
+        Chief Engineer {name} tried to reprogram it, but the {noun} just laughed and 
+        started streaming cooking shows to every screen on the station.
+        
+        The crew has given up fighting it. We now have the most entertaining AI in the galaxy!
+        It tells jokes, orders supplies, and somehow makes the best digital pancakes we've ever tasted.
+        
+        Mission Status: Successfully weird. Morale: Surprisingly high! 🥞🤖
+        """,
+    ],
+
+    "Romantic": [
+        """
+        💖 LOVE STORY: {place.upper()} EDITION 💖
+        
+        In the charming streets of {place}, {name} was having another ordinary day
+        until they spotted a {adjective} {noun} that could {verb} {adverb}.
+        
+        "Is this love at first sight or did I forget my glasses again?" wondered {name}.
+        
+        The {noun} approached with a bouquet of... wait for it... French fries! 🍟
+        They shared deep conversations about life, dreams, and whether pineapple belongs on pizza.
+        
+        Six months later, they're still together, running a food blog called 
+        "{adjective} Love and {noun} Recipes" with 2 million followers!
+        
+        True love finds a way... especially when it involves food! 💕🍽️
+        """,
+
+        """
+        🌹 THE {place.upper()} ROMANCE 🌹
+        
+        {name} was scrolling through dating apps when a {adjective} {noun} 
+        literally {verb}ed {adverb} into their life!
+        
+        "Well, this is either destiny or the universe has a weird sense of humor," thought {name}.
+        
+        Their first date was at a café where the {noun} ordered everything on the menu
+        and somehow managed to pay with interpretive dance.
+        
+        Now they live together in {place}, host a podcast called "Love is {adjective}",
+        and their relationship advice has helped thousands of couples worldwide!
+        
+        Sometimes the best love stories are the ones you never see coming! 💝📻
+        """,
+    ],
+}
+
+_SLOT_PATTERN = re.compile(r"\{(\w+)(?:\.(\w+)\(\))?\}")
+
+# Methods a slot may call on its input, e.g. {place.upper()}
+SLOT_TRANSFORMS = {
+    None: str,
+    "upper": str.upper,
+}
+SLOT_METHODS = {transform: method for method, transform in SLOT_TRANSFORMS.items()}
+
+# Fields a template slot may name
+TEMPLATE_FIELDS = frozenset(SILLY_SUGGESTIONS)
+
+class CompiledTemplate:
+    """A story template parsed into literal segments and input slots"""
+    __slots__ = ("literals", "slots")
+
+    def __init__(self, literals, slots):
+        self.literals = literals
+        self.slots = slots
+
+    @property
+    def fields(self):
+        return frozenset(field for field, _ in self.slots)
+
+    @property
+    def id(self):
+        """A stable id from the template's text, so saved stories can name the template they came from"""
+        parts = [self.literals[0]]
+        for i, (field, transform) in enumerate(self.slots, 1):
+            method = SLOT_METHODS[transform]
+            parts.append(f"{{{field}}}" if method is None else f"{{{field}.{method}()}}")
+            parts.append(self.literals[i])
+        return hashlib.blake2b("".join(parts).encode("utf-8"), digest_size=8).hexdigest()
+
+    def render(self, inputs):
+        literals = self.literals
+        parts = [literals[0]]
+        for i, (field, transform) in enumerate(self.slots, 1):
+            parts.append(transform(inputs[field]))
+            parts.append(literals[i])
+        return "".join(parts)
+
+def compile_template(source):
+    """Dedent and strip a template, then split it into literals and slots"""
+    text = textwrap.dedent(source).strip()
+    literals = []
+    slots = []
+    pos = 0
+    for match in _SLOT_PATTERN.finditer(text):
+        field, method = match.groups()
+        if method not in SLOT_TRANSFORMS:
+            raise ValueError(f"Unsupported slot method in template: {match.group(0)}")
+        literals.append(text[pos:match.start()])
+        slots.append((field, SLOT_TRANSFORMS[method]))
+        pos = match.end()
+    literals.append(text[pos:])
+    return CompiledTemplate(tuple(literals), tuple(slots))
+
+BUILTIN_TEMPLATES = {
+    theme: [compile_template(source) for source in sources]
+    for theme, sources in STORY_TEMPLATES.items()
+}
+
+# === Template packs ===
+# Extra templates live in JSON or TOML pack files in TEMPLATES_DIR:
+#
+#     [templates]
+#     Funny = ["""...""", """..."""]
+#
+# Packs are compiled once and cached (marshalled) in TEMPLATE_CACHE_DIR, and are reloaded
+# when a file changes, appears or disappears.
+
+TEMPLATES_DIR = "templates"
+TEMPLATE_CACHE_DIR = "template_cache"
+PACK_EXTENSIONS = (".json", ".toml")
+
+# generate_story looks for changed packs at most this often (seconds)
+RELOAD_INTERVAL = 2.0
+
+# Bump when the cached compiled form changes
+CACHE_VERSION = 1
+
+class TemplatePackError(ValueError):
+    """A template pack that can't be used: bad syntax, unknown theme or unknown slot"""
+
+def parse_pack(path, text):
+    """Source templates by theme from a pack file's text"""
+    toml = path.endswith(".toml")
+    if toml and tomllib is None:
+        raise TemplatePackError(f"{path}: TOML packs need Python 3.11 or newer")
+    try:
+        data = tomllib.loads(text) if toml else json.loads(text)
+    except ValueError as e:
+        raise TemplatePackError(f"can't parse {path}: {e}") from e
+    templates = data.get("templates") if isinstance(data, dict) else None
+    if not isinstance(templates, dict):
+        raise TemplatePackError(f"{path} has no [templates] table")
+    for theme, sources in templates.items():
+        if theme not in THEMES:
+            raise TemplatePackError(f"{path}: unknown theme {theme!r}")
+        if not isinstance(sources, list) or not all(isinstance(source, str) for source in sources):
+            raise TemplatePackError(f"{path}: templates for {theme} must be a list of strings")
+    return templates
+
+def compile_pack(path, text):
+    """Parse and compile a pack, checking every slot names a known field"""
+    compiled = {}
+    for theme, sources in parse_pack(path, text).items():
+        compiled[theme] = []
+        for i, source in enumerate(sources, 1):
+            try:
+                template = compile_template(source)
+            except ValueError as e:
+                raise TemplatePackError(f"{path}: {theme} template {i}: {e}") from e
+            unknown = template.fields - TEMPLATE_FIELDS
+            if unknown:
+                raise TemplatePackError(f"{path}: {theme} template {i} uses unknown slot(s) {', '.join(sorted(unknown))}")
+            compiled[theme].append(template)
+    return compiled
+
+def _template_to_tuple(template):
+    return template.literals, tuple((field, SLOT_METHODS[transform]) for field, transform in template.slots)
+
+def _template_from_tuple(data):
+    literals, slots = data
+    return CompiledTemplate(literals, tuple([(field, SLOT_TRANSFORMS[method]) for field, method in slots]))
+
+class TemplateLibrary:
+    """The built-in templates plus every pack in a directory, kept up to date.
+
+    Each pack's compiled form is cached on disk under a hash of its
+    contents (and of the fields and themes it was checked against). An
+    index maps every pack file to its modification time, size and hash,
+    so an unchanged pack is loaded from the cache without even being read.
+    """
+
+    def __init__(self, builtin, directory=TEMPLATES_DIR, cache_dir=TEMPLATE_CACHE_DIR):
+        self.builtin = builtin
+        self.directory = directory
+        self.cache_dir = cache_dir
+        self.templates = {theme: list(templates) for theme, templates in builtin.items()}
+        self.lock = threading.Lock()
+        self.next_check = 0.0
+        # pack path -> ((mtime_ns, size), compiled templates by theme)
+        self.packs = {}
+        # template id -> template, built on first lookup
+        self.by_id = None
+
+    def refresh(self):
+        """Reload packs if RELOAD_INTERVAL has passed and anything in the directory changed"""
+        if time.monotonic() < self.next_check:
+            return
+        with self.lock:
+            if time.monotonic() < self.next_check:
+                return
+            self.reload()
+            self.next_check = time.monotonic() + RELOAD_INTERVAL
+
+    def reload(self):
+        found = {}
+        try:
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and entry.name.endswith(PACK_EXTENSIONS):
+                    stat = entry.stat()
+                    found[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            pass
+        if found == {path: signature for path, (signature, _) in self.packs.items()}:
+            return
+
+        index = self._read_index()
+        packs = {}
+        for path, signature in sorted(found.items()):
+            if path in self.packs and self.packs[path][0] == signature:
+                packs[path] = self.packs[path]
+                continue
+            try:
+                packs[path] = (signature, self._load_pack(path, signature, index))
+            except (OSError, TemplatePackError) as e:
+                # Remembered as empty, so it is only reported again once it changes
+                print(f"⚠️ Skipping template pack: {e}")
+                packs[path] = (signature, {})
+        self.packs = packs
+        self._write_index(index)
+
+        # Swap in each theme's new list whole, so readers never see a half-built one
+        for theme, builtin in self.builtin.items():
+            templates = list(builtin)
+            for _, compiled in packs.values():
+                templates.extend(compiled.get(theme, ()))
+            self.templates[theme] = templates
+        self.by_id = None
+
+    def find(self, template_id):
+        """The template with this id (built in or from a pack), or None"""
+        self.refresh()
+        by_id = self.by_id
+        if by_id is None:
+            by_id = self.by_id = {
+                template.id: template for templates in list(self.templates.values()) for template in templates
+            }
+        return by_id.get(template_id)
+
+    def _load_pack(self, path, signature, index):
+        entry = index.get(path)
+        if entry is not None and entry["signature"] == list(signature):
+            cached = self._read_cache(entry["hash"])
+            if cached is not None:
+                return cached
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        salt = f"{CACHE_VERSION}\0{sys.version}\0{sorted(TEMPLATE_FIELDS)}\0{sorted(THEMES)}\0"
+        key = hashlib.sha256((salt + text).encode("utf-8")).hexdigest()
+        index[path] = {"signature": list(signature), "hash": key}
+        cached = self._read_cache(key)
+        if cached is not None:
+            return cached
+        compiled = compile_pack(path, text)
+        self._write_cache(key, compiled)
+        return compiled
+
+    def _cache_path(self, key):
+        return os.path.join(self.cache_dir, key + ".marshal")
+
+    def _read_cache(self, key):
+        try:
+            with open(self._cache_path(key), "rb") as f:
+                data = marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        return {theme: [_template_from_tuple(template) for template in templates] for theme, templates in data.items()}
+
+    def _write_cache(self, key, compiled):
+        data = {theme: [_template_to_tuple(template) for template in templates] for theme, templates in compiled.items()}
+        self._write_file(self._cache_path(key), marshal.dumps(data))
+
+    def _read_index(self):
+        try:
+            with open(os.path.join(self.cache_dir, "index.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self, index):
+        # Forget packs that are gone; their cached forms stay for if they come back
+        index = {path: entry for path, entry in index.items() if path in self.packs}
+        self._write_file(os.path.join(self.cache_dir, "index.json"), json.dumps(index).encode("utf-8"))
+
+    def _write_file(self, path, data):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Could not write template cache: {e}")
+
+template_library = TemplateLibrary(BUILTIN_TEMPLATES)
+
+# Templates by theme, including packs (updated in place when packs change)
+COMPILED_TEMPLATES = template_library.templates
+
+def pick_template(theme, rng=random, samplers=None):
+    """A random template for the theme; with samplers (a SamplerSet), recent templates aren't repeated"""
+    template_library.refresh()
+    templates = COMPILED_TEMPLATES[theme]
+    if samplers is None:
+        return rng.choice(templates)
+    return templates[samplers.draw(f"theme:{theme}", len(templates), rng)]
+
+def generate_story(inputs, theme, rng=random, samplers=None):
+    """Render a random template for the theme"""
+    return pick_template(theme, rng, samplers).render(inputs)
@@ -0,0 +1,40 @@
+"""Theme colours, fonts and emoji"""
+
+THEMES = {
+    "Funny": {
+        "bg": "#fff5b7",
+        "accent": "#ffeb3b",
+        "button": "#ff9800",
+        "text": "#333333",
+        "emoji": "😂",
+        "font": ("Comic Sans MS", 12),
+        "sounds": ["laugh.mp3", "comedy.mp3", "giggle.mp3"]
+    },
+    "Spooky": {
+        "bg": "#2a1810",
+        "accent": "#8b0000",
+        "button": "#ff4444",
+        "text": "#ffffff",
+        "emoji": "👻",
+        "font": ("Chiller", 12),
+        "sounds": ["spooky.mp3", "creepy.mp3", "thunder.mp3"]
+    },
+    "Sci-Fi": {
+        "bg": "#0d1b2a",
+        "accent": "#00ffff",
+        "button": "#7209b7",
+        "text": "#00ff00",
+        "emoji": "🛸",
+        "font": ("Courier New", 12),
+        "sounds": ["computer.mp3", "teleport.mp3"]
+    },
+    "Romantic": {
+        "bg": "#fce4ec",
+        "accent": "#e91e63",
+        "button": "#ff69b4",
+        "text": "#880e4f",
+        "emoji": "💕",
+        "font": ("Brush Script MT", 12),
+        "sounds": ["whistle.mp3", "soft_music.mp3"]
+    }
+}
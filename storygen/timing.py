@@ -0,0 +1,85 @@
+"""Timing spans for the story lifecycle, exported as JSON Lines and Prometheus text.
+
+Nothing is recorded until enable_timings() is called (the --timings
+option of the app), so span() costs next to nothing by default.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+TIMINGS_FILE = "timings.jsonl"
+# Named for node_exporter's textfile collector, which reads *.prom files
+METRICS_FILE = "storygen.prom"
+
+# Labels copied into the Prometheus metrics; the rest (like the story run
+# number) only go to the JSON lines, to keep the number of series small
+PROMETHEUS_LABELS = ("theme",)
+
+def _label_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class SpanRecorder:
+    """Appends every span to a JSON Lines file and keeps per-span totals in a Prometheus text file"""
+
+    def __init__(self, directory="."):
+        os.makedirs(directory, exist_ok=True)
+        self.jsonl_path = os.path.join(directory, TIMINGS_FILE)
+        self.prom_path = os.path.join(directory, METRICS_FILE)
+        self.lock = threading.Lock()
+        # (span, labels) -> [count, total seconds, last seconds]
+        self.totals = {}
+
+    def record(self, name, seconds, **labels):
+        entry = {"time": round(time.time(), 3), "span": name, "seconds": round(seconds, 6), **labels}
+        key = (name, tuple((label, labels[label]) for label in PROMETHEUS_LABELS if label in labels))
+        with self.lock:
+            with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            totals = self.totals.setdefault(key, [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+            totals[2] = seconds
+            self._write_prometheus()
+
+    def _write_prometheus(self):
+        lines = [
+            "# HELP storygen_span_seconds Time spent in each phase of the story lifecycle",
+            "# TYPE storygen_span_seconds summary",
+        ]
+        last = [
+            "# HELP storygen_span_last_seconds Duration of the most recent span",
+            "# TYPE storygen_span_last_seconds gauge",
+        ]
+        for (name, labels), (count, total, latest) in sorted(self.totals.items()):
+            label_text = ",".join(f'{label}="{_label_value(value)}"' for label, value in (("span", name), *labels))
+            lines.append(f"storygen_span_seconds_sum{{{label_text}}} {total:.6f}")
+            lines.append(f"storygen_span_seconds_count{{{label_text}}} {count}")
+            last.append(f"storygen_span_last_seconds{{{label_text}}} {latest:.6f}")
+        # The exporter may read at any moment, so never let it see a half-written file
+        tmp_path = self.prom_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines + last) + "\n")
+        os.replace(tmp_path, self.prom_path)
+
+recorder = None
+
+def enable_timings(directory="."):
+    """Start recording spans to TIMINGS_FILE and METRICS_FILE in directory"""
+    global recorder
+    recorder = SpanRecorder(directory)
+
+def record_span(name, seconds, **labels):
+    """Record a span that was timed elsewhere"""
+    if recorder is not None:
+        recorder.record(name, seconds, **labels)
+
+@contextmanager
+def span(name, **labels):
+    """Time the body of a with block as one span"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, time.perf_counter() - started, **labels)
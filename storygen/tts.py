@@ -0,0 +1,268 @@
+"""Offline text-to-speech.
+
+A single SpeechWorker thread owns the pyttsx3 engine. Everything else
+hands it requests through a priority queue, so callers never block on the
+engine (unless they choose to wait) and never race each other on it.
+"""
+import heapq
+import itertools
+import os
+import threading
+import time
+
+from .audio import play_file
+from .speech import clean_text_for_speech
+from .tts_cache import SpeechCache
+
+# Request priorities: lower numbers are spoken first
+URGENT = 0
+NORMAL = 1
+BACKGROUND = 2
+
+# How often the worker checks for cancellation while the engine is talking
+POLL_INTERVAL = 0.01
+
+class SpeechRequest:
+    """One piece of text waiting to be spoken"""
+
+    def __init__(self, text, priority, channel, cached, play=True):
+        self.text = text
+        self.priority = priority
+        self.channel = channel
+        self.cached = cached
+        self.play = play
+        self.submitted = time.perf_counter()
+        self.started = None
+        self.cancelled = False
+        # Set when there is no voice or the engine gave an error; nothing was cut off
+        self.failed = False
+        self.done = threading.Event()
+
+    def cancel(self):
+        self.cancelled = True
+
+    def wait(self, timeout=None):
+        """Block until the request is finished; False if it was cut off (or timed out).
+
+        A request that failed to speak still counts as finished, so a
+        sequence of them (a narration, a presentation) carries on silently.
+        """
+        self.done.wait(timeout)
+        return self.done.is_set() and not self.cancelled
+
+class SpeechWorker(threading.Thread):
+    """Thread that owns the TTS engine and speaks queued requests in priority order.
+
+    Submitting a request with a channel cancels every queued or playing
+    request on that channel, so e.g. a new story cuts off the old
+    narration. Live speech is interrupted within about POLL_INTERVAL;
+    cached clips are cut off just as fast when pygame's mixer is available.
+    """
+
+    def __init__(self, rate=160, volume=1.0, cache=None):
+        super().__init__(name="speech-worker", daemon=True)
+        self.rate = rate
+        self.volume = volume
+        self.cache = cache
+        self.engine = None
+        self.ready = threading.Event()
+        self.condition = threading.Condition()
+        self.queue = []
+        self.order = itertools.count()
+        self.current = None
+        self.spoken_count = 0
+        self.cancelled_count = 0
+        self.failed_count = 0
+        self.first_audio_times = []
+
+    # --- Called from any thread ---
+
+    def submit(self, text, priority=NORMAL, channel=None, cached=False, replace=True, play=True):
+        """Queue text to be spoken and return its SpeechRequest.
+
+        With replace=False the request joins its channel without cancelling
+        what is already on it (e.g. the sentences of one narration). A
+        cached request with play=False only renders the audio cache.
+        """
+        request = SpeechRequest(text, priority, channel, cached, play)
+        with self.condition:
+            if channel is not None and replace:
+                self._cancel_where(lambda queued: queued.channel == channel)
+            heapq.heappush(self.queue, (priority, next(self.order), request))
+            self.condition.notify()
+        return request
+
+    def cancel_channel(self, channel):
+        """Drop queued requests on a channel and cut off the one playing, if any"""
+        with self.condition:
+            self._cancel_where(lambda queued: queued.channel == channel)
+
+    def cancel_all(self):
+        """Drop everything queued and cut off whatever is playing"""
+        with self.condition:
+            self._cancel_where(lambda queued: True)
+
+    def _cancel_where(self, matches):
+        for _, _, queued in self.queue:
+            if matches(queued) and not queued.cancelled:
+                queued.cancel()
+        if self.current is not None and matches(self.current):
+            self.current.cancel()
+
+    def metrics(self):
+        """Queue depth, request counts and time-to-first-audio (milliseconds)"""
+        with self.condition:
+            depth = sum(1 for _, _, queued in self.queue if not queued.cancelled)
+            times = list(self.first_audio_times)
+        return {
+            "queue_depth": depth,
+            "spoken": self.spoken_count,
+            "cancelled": self.cancelled_count,
+            "failed": self.failed_count,
+            "time_to_first_audio_last_ms": times[-1] * 1000 if times else None,
+            "time_to_first_audio_avg_ms": sum(times) / len(times) * 1000 if times else None,
+            "time_to_first_audio_max_ms": max(times) * 1000 if times else None,
+        }
+
+    # --- Worker thread ---
+
+    def _start_engine(self):
+        # The engine is imported and created here so it lives entirely on this
+        # thread, and so its slow start never holds up the window
+        import pyttsx3
+        self.engine = pyttsx3.init()
+        self.engine.setProperty("rate", self.rate)
+        self.engine.setProperty("volume", self.volume)
+        voices = self.engine.getProperty("voices")
+        self.engine.setProperty("voice", voices[1].id if len(voices) > 1 else voices[0].id)
+        self.engine.connect("started-utterance", self._on_started)
+        self.engine.startLoop(False)
+
+    def run(self):
+        try:
+            self._start_engine()
+        except Exception as e:
+            print("Voice error:", e)
+            self.engine = None
+        finally:
+            self.ready.set()
+
+        while True:
+            request = self._next_request()
+            try:
+                if self.engine is None:
+                    # No voice available: finish requests unspoken so waiters don't hang
+                    request.failed = True
+                elif request.cached and self.cache is not None:
+                    self._play_cached(request)
+                else:
+                    self._speak_live(request)
+            except Exception as e:
+                print("Voice error:", e)
+                request.failed = True
+            finally:
+                with self.condition:
+                    self.current = None
+                    if request.cancelled:
+                        self.cancelled_count += 1
+                    elif request.failed:
+                        self.failed_count += 1
+                    else:
+                        self.spoken_count += 1
+                request.done.set()
+
+    def _next_request(self):
+        with self.condition:
+            while True:
+                while not self.queue:
+                    self.condition.wait()
+                _, _, request = heapq.heappop(self.queue)
+                if not request.cancelled:
+                    self.current = request
+                    return request
+                self.cancelled_count += 1
+                request.done.set()
+
+    def _on_started(self, name):
+        request = self.current
+        if request is not None and request.started is None:
+            self._record_first_audio(request)
+
+    def _record_first_audio(self, request):
+        request.started = time.perf_counter()
+        self.first_audio_times.append(request.started - request.submitted)
+        del self.first_audio_times[:-100]
+
+    def _pump(self, request):
+        """Run the engine until it goes idle, stopping early if the request is cancelled"""
+        while self.engine.isBusy():
+            if request.cancelled:
+                self.engine.stop()
+                return
+            self.engine.iterate()
+            time.sleep(POLL_INTERVAL)
+
+    def _speak_live(self, request):
+        self.engine.say(request.text)
+        self._pump(request)
+
+    def _play_cached(self, request):
+        key = self.cache.key(
+            request.text,
+            self.engine.getProperty("voice"),
+            self.engine.getProperty("rate"),
+            self.engine.getProperty("volume"),
+        )
+        path = self.cache.get(key)
+        if path is None:
+            path = self.cache.put(key, lambda tmp_path: self._render(request, tmp_path))
+        if request.cancelled or not request.play:
+            return
+        if path is None:
+            self._speak_live(request)
+            return
+        self._record_first_audio(request)
+        play_file(path, stop_when=lambda: request.cancelled)
+
+    def _render(self, request, path):
+        self.engine.save_to_file(request.text, path)
+        self._pump(request)
+        if request.cancelled and os.path.exists(path):
+            # Half-rendered audio must not end up in the cache
+            os.remove(path)
+
+worker = None
+
+def init_tts():
+    """Start the speech worker without waiting for its engine; only the GUI needs it.
+
+    Requests submitted before the engine is up wait in the queue.
+    """
+    global worker
+    worker = SpeechWorker(cache=SpeechCache())
+    worker.start()
+
+def speak(text, priority=NORMAL, channel=None, wait=False, replace=True):
+    """Queue text for the speech worker; with wait=True, block until it has been spoken.
+
+    Returns the SpeechRequest, or when waiting, False if it was cut off
+    (a request that failed to speak is not cut off).
+    """
+    request = worker.submit(text, priority, channel, replace=replace)
+    return request.wait() if wait else request
+
+def speak_cached(text, priority=NORMAL, channel=None, wait=False):
+    """Like speak(), for fixed phrases: synthesized to the audio cache the first time"""
+    request = worker.submit(clean_text_for_speech(text), priority, channel, cached=True)
+    return request.wait() if wait else request
+
+def prepare_cached(text):
+    """Render a fixed phrase into the audio cache ahead of time, without playing it"""
+    return worker.submit(clean_text_for_speech(text), cached=True, play=False)
+
+def cancel_speech(channel=None):
+    """Stop speech on one channel, or everything if channel is None"""
+    if channel is None:
+        worker.cancel_all()
+    else:
+        worker.cancel_channel(channel)
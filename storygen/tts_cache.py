@@ -0,0 +1,90 @@
+"""On-disk cache of synthesized speech"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+TTS_CACHE_DIR = "tts_cache"
+TTS_CACHE_MAX_BYTES = 64 * 1024 * 1024
+AUDIO_EXTENSION = ".wav"
+
+class SpeechCache:
+    """Audio files keyed by a hash of the text and voice settings, evicted least recently used first.
+
+    Recency survives restarts through file modification times, which are
+    bumped on every hit.
+    """
+
+    def __init__(self, directory=TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self._scan()
+
+    def _scan(self):
+        os.makedirs(self.directory, exist_ok=True)
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".tmp" + AUDIO_EXTENSION):
+                # Left behind by a render that never finished
+                os.remove(entry.path)
+            elif entry.is_file() and entry.name.endswith(AUDIO_EXTENSION):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(files):
+            self.entries[name] = size
+            self.total_bytes += size
+
+    @staticmethod
+    def key(text, voice, rate, volume):
+        """Cache key for text spoken with the given voice settings"""
+        return hashlib.sha256(f"{voice}\0{rate}\0{volume}\0{text}".encode("utf-8")).hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.directory, key + AUDIO_EXTENSION)
+
+    def get(self, key):
+        """Path of the cached audio for key, or None on a miss"""
+        name = key + AUDIO_EXTENSION
+        with self.lock:
+            if name not in self.entries:
+                return None
+            self.entries.move_to_end(name)
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Deleted behind our back; forget it
+            with self.lock:
+                self.total_bytes -= self.entries.pop(name, 0)
+            return None
+        return path
+
+    def put(self, key, render):
+        """Create the audio for key with render(path) and return its path, or None if nothing was written"""
+        path = self.path_for(key)
+        tmp_path = os.path.join(self.directory, key + ".tmp" + AUDIO_EXTENSION)
+        render(tmp_path)
+        if not os.path.exists(tmp_path) or not os.path.getsize(tmp_path):
+            return None
+        os.replace(tmp_path, path)
+
+        name = key + AUDIO_EXTENSION
+        size = os.path.getsize(path)
+        with self.lock:
+            self.total_bytes += size - self.entries.pop(name, 0)
+            self.entries[name] = size
+            self._evict()
+        return path
+
+    def _evict(self):
+        # Never evict the newest entry, even if it alone is over the limit
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            name, size = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,236 @@
+"""Saved Stories window that loads stories a page at a time"""
+import tkinter as tk
+from collections import deque
+from contextlib import contextmanager
+from tkinter import messagebox, ttk
+
+from .themes import THEMES
+
+PAGE_SIZE = 20
+
+# Pages kept in the text widget; pages scrolled far past are dropped and fetched again when you scroll back
+MAX_LOADED_PAGES = 10
+
+# Load the next page once the bottom of the view passes this point (or the
+# previous one once the top of the view is within the same distance of the top)
+PREFETCH_AT = 0.9
+
+SEARCH_RESULTS = 50
+
+ALL_THEMES = "All"
+
+class SavedStoriesViewer:
+    """Browse saved stories newest first, fetching pages from the store on scroll.
+
+    Opening the window only queries the first page, so it takes the same
+    time however many stories are saved. get_search_index is called the
+    first time a search is run.
+    """
+
+    def __init__(self, parent, store, styles, get_search_index):
+        self.store = store
+        self.get_search_index = get_search_index
+        self.before_id = None
+        self.exhausted = False
+        self.loading = False
+        self.load_queued = False
+        # (mark, before_id it was queried with) for each page in the widget, top to bottom
+        self.pages = deque()
+        # before_ids of the pages dropped from the top, the nearest last
+        self.dropped_above = []
+
+        self.window = tk.Toplevel(parent)
+        self.window.title("📚 Saved Stories")
+        self.window.geometry("700x500")
+        styles.style(self.window, "window")
+
+        # Filter and jump controls
+        toolbar = styles.style(ttk.Frame(self.window), "frame")
+        toolbar.pack(fill="x", padx=10, pady=(10, 0))
+
+        styles.style(ttk.Label(toolbar, text="Theme:"), "label").pack(side=tk.LEFT)
+        self.theme_var = tk.StringVar(value=ALL_THEMES)
+        tk.OptionMenu(toolbar, self.theme_var, ALL_THEMES, *THEMES,
+                      command=lambda x: self.show_from()).pack(side=tk.LEFT, padx=5)
+
+        styles.style(ttk.Label(toolbar, text="Go to #"), "label").pack(side=tk.LEFT, padx=(15, 0))
+        self.jump_var = tk.StringVar()
+        jump_entry = tk.Entry(toolbar, textvariable=self.jump_var, font=("Arial", 10), width=8)
+        jump_entry.pack(side=tk.LEFT, padx=5)
+        jump_entry.bind("<Return>", lambda event: self.jump())
+        styles.style(ttk.Button(toolbar, text="Go", command=self.jump), "button").pack(side=tk.LEFT)
+        styles.style(ttk.Button(toolbar, text="⬆ Newest", command=self.show_from), "button").pack(side=tk.LEFT, padx=5)
+
+        # Search box
+        search_bar = styles.style(ttk.Frame(self.window), "frame")
+        search_bar.pack(fill="x", padx=10, pady=(5, 0))
+        styles.style(ttk.Label(search_bar, text="🔍 Search:"), "label").pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        search_entry = tk.Entry(search_bar, textvariable=self.search_var, font=("Arial", 10))
+        search_entry.pack(side=tk.LEFT, fill="x", expand=True, padx=5)
+        search_entry.bind("<Return>", lambda event: self.search())
+        styles.style(ttk.Button(search_bar, text="Search", command=self.search), "button").pack(side=tk.LEFT)
+
+        # Scrollable text widget
+        self.text = styles.style(tk.Text(self.window, font=("Arial", 10), wrap="word"), "text")
+        self.scrollbar = tk.Scrollbar(self.window, orient="vertical", command=self.text.yview)
+        self.text.configure(yscrollcommand=self.on_scroll)
+        self.text.pack(side="left", fill="both", expand=True, padx=10, pady=10)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.show_from()
+
+    def selected_theme(self):
+        theme = self.theme_var.get()
+        return None if theme == ALL_THEMES else theme
+
+    def clear(self):
+        while self.pages:
+            self.text.mark_unset(self.pages.pop()[0])
+        self.dropped_above = []
+        self.text.config(state="normal")
+        self.text.delete("1.0", tk.END)
+        self.text.config(state="disabled")
+
+    def insert_story(self, story, index=tk.END):
+        self.text.insert(index, f"📖 Story #{story['id']} - {story['theme']} ({story['timestamp']})\n" + "="*50 + "\n" + story['story'] + "\n\n")
+
+    def show_from(self, before_id=None):
+        """Clear the view and show stories older than before_id (newest if None)"""
+        self.clear()
+        self.before_id = before_id
+        self.exhausted = False
+        self.load_page()
+        if self.text.compare("end-1c", "==", "1.0"):
+            self.text.config(state="normal")
+            self.text.insert(tk.END, "📭 No saved stories match this filter.")
+            self.text.config(state="disabled")
+
+    def load_page(self):
+        """Append the next page of stories, dropping the top page if too many are loaded"""
+        if self.exhausted or self.loading:
+            return
+        self.loading = True
+        try:
+            before_id = self.before_id
+            stories = self.store.query(self.selected_theme(), PAGE_SIZE, before_id)
+            if len(stories) < PAGE_SIZE:
+                self.exhausted = True
+            if not stories:
+                return
+
+            self.text.config(state="normal")
+            mark = f"page{stories[0]['id']}"
+            self.text.mark_set(mark, "end-1c")
+            self.text.mark_gravity(mark, "left")
+            self.pages.append((mark, before_id))
+            for story in stories:
+                self.insert_story(story)
+            self.before_id = stories[-1]["id"]
+
+            if len(self.pages) > MAX_LOADED_PAGES:
+                with self.view_kept():
+                    dropped, dropped_before_id = self.pages.popleft()
+                    self.text.mark_unset(dropped)
+                    self.text.delete("1.0", self.pages[0][0])
+                self.dropped_above.append(dropped_before_id)
+            self.text.config(state="disabled")
+        finally:
+            self.loading = False
+
+    def load_page_above(self):
+        """Fetch the nearest page dropped from the top again, dropping the bottom page if too many are loaded"""
+        if not self.dropped_above or self.loading:
+            return
+        self.loading = True
+        try:
+            before_id = self.dropped_above.pop()
+            stories = self.store.query(self.selected_theme(), PAGE_SIZE, before_id)
+            if not stories:
+                return
+
+            self.text.config(state="normal")
+            with self.view_kept():
+                # The current top page must end up after the text going in above it
+                self.text.mark_gravity(self.pages[0][0], "right")
+                for story in reversed(stories):
+                    self.insert_story(story, "1.0")
+                self.text.mark_gravity(self.pages[0][0], "left")
+                mark = f"page{stories[0]['id']}"
+                self.text.mark_set(mark, "1.0")
+                self.text.mark_gravity(mark, "left")
+                self.pages.appendleft((mark, before_id))
+
+                if len(self.pages) > MAX_LOADED_PAGES:
+                    dropped, dropped_before_id = self.pages.pop()
+                    self.text.delete(dropped, "end-1c")
+                    self.text.mark_unset(dropped)
+                    # Scrolling down fetches it again
+                    self.before_id = dropped_before_id
+                    self.exhausted = False
+            self.text.config(state="disabled")
+        finally:
+            self.loading = False
+
+    @contextmanager
+    def view_kept(self):
+        """Keep the same text in view while pages are added or removed out of sight"""
+        self.text.mark_set("view_top", "@0,0")
+        # Text inserted right at the top of the view goes above it
+        self.text.mark_gravity("view_top", "right")
+        try:
+            yield
+        finally:
+            self.text.yview("view_top")
+            self.text.mark_unset("view_top")
+
+    def search(self):
+        """Show the best matches for the search box, or the newest stories if it is empty"""
+        query = self.search_var.get().strip()
+        if not query:
+            self.show_from()
+            return
+        results = self.get_search_index().search(query, SEARCH_RESULTS, self.selected_theme())
+
+        # Search results are a single list, so stop paging until the next show_from()
+        self.clear()
+        self.exhausted = True
+        self.text.config(state="normal")
+        # The index can name a story the store no longer has (e.g. a skipped damaged line)
+        stories = [story for story in (self.store.get(story_id) for _, story_id in results) if story is not None]
+        if not stories:
+            self.text.insert(tk.END, f"📭 No stories match \"{query}\".")
+        for story in stories:
+            self.insert_story(story)
+        self.text.config(state="disabled")
+
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        # One load at a time: scrolling sends many events before the first one runs
+        if not self.load_queued and (float(last) >= PREFETCH_AT or float(first) <= 1 - PREFETCH_AT):
+            self.load_queued = True
+            self.window.after_idle(self.load_more)
+
+    def load_more(self):
+        """Load a page below or above if the view is still near that end once the event queue is idle"""
+        self.load_queued = False
+        first, last = self.text.yview()
+        if last >= PREFETCH_AT and not self.exhausted:
+            self.load_page()
+        elif first <= 1 - PREFETCH_AT and self.dropped_above:
+            self.load_page_above()
+
+    def jump(self):
+        """Show the story with the entered id, followed by older ones"""
+        try:
+            story_id = int(self.jump_var.get().strip().lstrip("#"))
+        except ValueError:
+            messagebox.showwarning("Go to Story", "Please enter a story number.", parent=self.window)
+            return
+        story = self.store.get(story_id)
+        if story is None:
+            messagebox.showinfo("Go to Story", f"📭 There is no story #{story_id}.", parent=self.window)
+            return
+        if self.selected_theme() not in (None, story["theme"]):
+            self.theme_var.set(ALL_THEMES)
+        self.show_from(story_id + 1)
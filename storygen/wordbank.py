@@ -0,0 +1,120 @@
+"""Large word banks in memory-mapped, offset-indexed files.
+
+A bank file holds one field's words as a header, a table of uint32
+offsets and the UTF-8 words back to back:
+
+    b"SGWBANK1" | count | offset[0] ... offset[count] | word bytes
+
+Picking a random word reads two offsets and decodes one word, so it takes
+the same time however big the bank is, and the words never become Python
+objects until they are picked. Banks are opened read-only with mmap, so
+every app process on a host shares the same pages through the OS cache.
+"""
+import mmap
+import os
+import struct
+import threading
+
+WORD_BANK_DIR = "wordbanks"
+BANK_EXTENSION = ".bank"
+
+MAGIC = b"SGWBANK1"
+_HEADER = struct.Struct("<8sI")
+_OFFSET = struct.Struct("<I")
+_SPAN = struct.Struct("<II")
+
+class WordBank:
+    """One field's words, memory-mapped from a bank file"""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = _HEADER.unpack_from(self.data)
+        table_end = _HEADER.size + _OFFSET.size * (self.count + 1)
+        if magic != MAGIC or not self.count or len(self.data) < table_end:
+            self.data.close()
+            raise ValueError(f"{path} is not a word bank")
+        self.words_start = table_end
+        (words_size,) = _OFFSET.unpack_from(self.data, table_end - _OFFSET.size)
+        if len(self.data) != table_end + words_size:
+            self.data.close()
+            raise ValueError(f"{path} is truncated")
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        start, end = _SPAN.unpack_from(self.data, _HEADER.size + _OFFSET.size * i)
+        return self.data[self.words_start + start:self.words_start + end].decode("utf-8")
+
+    def sample(self, rng):
+        return self[rng.randrange(self.count)]
+
+def write_bank(words, path):
+    """Write words to a bank file (atomically) and return how many were written"""
+    encoded = [word.encode("utf-8") for word in words]
+    offsets = [0]
+    for word in encoded:
+        offsets.append(offsets[-1] + len(word))
+    if offsets[-1] >= 2**32:
+        raise ValueError("word bank is too large (4 GB of words at most)")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, len(encoded)))
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        f.writelines(encoded)
+    os.replace(tmp_path, path)
+    return len(encoded)
+
+def read_word_list(path):
+    """Unique, non-blank lines of a text file, in order"""
+    with open(path, "r", encoding="utf-8") as f:
+        return list(dict.fromkeys(line.strip() for line in f if line.strip()))
+
+def build_banks(source_dir, fields, builtin, out_dir=WORD_BANK_DIR):
+    """Build a bank for every field with a <field>.txt list in source_dir (one word per line).
+
+    The built-in words for the field come first, so they stay in the mix.
+    Returns {field: word count}.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    written = {}
+    for field in fields:
+        source = os.path.join(source_dir, field + ".txt")
+        if not os.path.exists(source):
+            continue
+        words = list(dict.fromkeys([*builtin.get(field, ()), *read_word_list(source)]))
+        written[field] = write_bank(words, os.path.join(out_dir, field + BANK_EXTENSION))
+    return written
+
+class WordBanks:
+    """Banks by field, opened on first use; fields without a bank file get None"""
+
+    def __init__(self, directory=WORD_BANK_DIR):
+        self.directory = directory
+        self.banks = {}
+        self.lock = threading.Lock()
+
+    def get(self, field):
+        try:
+            return self.banks[field]
+        except KeyError:
+            pass
+        with self.lock:
+            if field not in self.banks:
+                self.banks[field] = self._open(field)
+            return self.banks[field]
+
+    def _open(self, field):
+        path = os.path.join(self.directory, field + BANK_EXTENSION)
+        if not os.path.exists(path):
+            return None
+        try:
+            return WordBank(path)
+        except (OSError, ValueError, struct.error) as e:
+            print(f"⚠️ Ignoring word bank {path}: {e}")
+            return None
+
+word_banks = WordBanks()
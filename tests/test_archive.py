@@ -0,0 +1,84 @@
+"""Round trips from a legacy file through the journal into the compressed archive"""
+import json
+
+from storygen.archive import BLOCK_RECORDS, StoryArchive
+from storygen.store import StoryStore
+
+def legacy_stories(count):
+    themes = ["Funny", "Spooky", "Romantic"]
+    return [
+        {
+            "id": story_id,
+            "timestamp": "2024-01-01 00:00:00",
+            "theme": themes[story_id % len(themes)],
+            # Every fifth text repeats, as duplicate saves do
+            "story": f"Story number {story_id - story_id % 5}.",
+            "inputs": {"noun": f"noun{story_id}"},
+        }
+        for story_id in range(1, count + 1)
+    ]
+
+def open_journal(tmp_path, **options):
+    return StoryStore(str(tmp_path / "stories.jsonl"), str(tmp_path / "stories.json"), **options).load()
+
+def test_legacy_file_to_journal_to_archive(tmp_path):
+    stories = legacy_stories(BLOCK_RECORDS * 2 + 50)
+    (tmp_path / "stories.json").write_text(json.dumps(stories), encoding="utf-8")
+
+    store = open_journal(tmp_path, archive_threshold=None)
+    assert store.roll(keep=100) == len(stories) - 100
+
+    store = open_journal(tmp_path)
+    assert len(store.archive) == len(stories) - 100 and len(store.stories) == 100
+    assert list(store) == stories
+    assert store.get(1) == stories[0] and store.get(len(stories)) == stories[-1]
+    assert store.get(len(stories) + 1) is None
+    assert store.query("Spooky", 5, before_id=200) == [story for story in reversed(stories[:199]) if story["theme"] == "Spooky"][:5]
+    # The legacy file is left as it was
+    assert json.loads((tmp_path / "stories.json").read_text(encoding="utf-8")) == stories
+
+def test_saves_after_a_roll_continue_the_ids(tmp_path):
+    store = open_journal(tmp_path)
+    for story_id in range(1, 11):
+        store.add("Funny", f"Story {story_id}.")
+    store.roll(keep=0)
+
+    assert store.add("Funny", "After the roll.")["id"] == 11
+    assert [story["id"] for story in open_journal(tmp_path)] == list(range(1, 12))
+
+def test_roll_interrupted_before_the_journal_was_rewritten(tmp_path):
+    store = open_journal(tmp_path)
+    for story_id in range(1, 31):
+        store.add("Spooky", f"Story {story_id}.")
+    # roll() archives first; here the process stops before it compacts the journal
+    StoryArchive(str(tmp_path / "stories.archive")).load().append(store.stories[:20])
+
+    store = open_journal(tmp_path)
+    assert [story["id"] for story in store] == list(range(1, 31))
+    assert [story["id"] for story in store.stories] == list(range(21, 31))
+    # The copies already in the archive are dropped from the journal
+    with open(tmp_path / "stories.jsonl", "r", encoding="utf-8") as f:
+        assert [json.loads(line)["id"] for line in f] == list(range(21, 31))
+
+def test_archive_append_interrupted_before_the_index_was_written(tmp_path):
+    path = str(tmp_path / "stories.archive")
+    stories = legacy_stories(10)
+    StoryArchive(path).append(stories[:5])
+    # Half a block past the indexed end, and no index entry for it
+    with open(path, "ab") as f:
+        f.write(b"\x78\x9c half a block")
+
+    archive = StoryArchive(path).load()
+    assert list(archive) == stories[:5]
+    archive.append(stories[5:])
+    assert list(StoryArchive(path).load()) == stories
+
+def test_lzma_archive(tmp_path):
+    path = str(tmp_path / "stories.archive")
+    stories = legacy_stories(BLOCK_RECORDS + 1)
+    StoryArchive(path, codec="lzma").append(stories)
+
+    archive = StoryArchive(path).load()
+    assert archive.codec == "lzma"
+    assert archive.get(BLOCK_RECORDS + 1) == stories[-1]
+    assert len(archive.blocks) == 2
@@ -0,0 +1,49 @@
+"""No-repeat sampling: the window holds, and the saved state stays small"""
+import json
+import random
+
+from storygen.sampling import MAX_WINDOW, RecencySampler, SamplerSet
+
+def test_no_repeat_within_the_window():
+    rng = random.Random(1)
+    for size, window in [(2, None), (10, None), (10, 9), (5000, None), (100, 60)]:
+        sampler = RecencySampler(size, window)
+        picks = [sampler.draw(rng) for _ in range(size * 5)]
+        for i in range(len(picks)):
+            assert picks[i] not in picks[max(0, i - sampler.window):i]
+
+def test_state_round_trip():
+    rng = random.Random(2)
+    sampler = RecencySampler(50)
+    for _ in range(100):
+        sampler.draw(rng)
+    restored = RecencySampler.from_dict(json.loads(json.dumps(sampler.to_dict())))
+    assert restored.to_dict() == sampler.to_dict()
+
+    # The restored sampler keeps avoiding the picks made before it was saved
+    recent = list(sampler.recent)
+    picks = [restored.draw(rng) for _ in range(restored.window)]
+    for i, pick in enumerate(picks):
+        assert pick not in recent[i + 1:] + picks[:i]
+
+def test_state_stays_bounded_by_the_window(tmp_path):
+    rng = random.Random(3)
+    sampler = RecencySampler(100_000)
+    for _ in range(300_000):
+        sampler.draw(rng)
+    assert sampler.window == MAX_WINDOW
+    assert len(sampler.recent) == len(sampler.recent_set) == MAX_WINDOW
+
+    samplers = SamplerSet(str(tmp_path / "state.json"))
+    for _ in range(50_000):
+        samplers.draw("field:noun", 100_000, rng)
+    samplers.save()
+    assert (tmp_path / "state.json").stat().st_size < 20 * MAX_WINDOW
+
+def test_sampler_starts_over_when_the_list_changes():
+    rng = random.Random(4)
+    samplers = SamplerSet()
+    for _ in range(20):
+        samplers.draw("theme:Funny", 10, rng)
+    assert 0 <= samplers.draw("theme:Funny", 3, rng) < 3
+    assert samplers.samplers["theme:Funny"].size == 3
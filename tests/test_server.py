@@ -0,0 +1,119 @@
+"""StoryService requests: validation, routing and paging through saved stories"""
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+import pytest
+
+from storygen.server import PAGE_SIZE, HTTPError, StoryService
+from storygen.store import StoryStore
+from storygen.suggestions import SILLY_SUGGESTIONS
+
+WORDS = {field: field + "-word" for field in SILLY_SUGGESTIONS}
+
+def open_journal(tmp_path):
+    return StoryStore(str(tmp_path / "stories.jsonl"), str(tmp_path / "stories.json")).load()
+
+def saved_service(tmp_path, count):
+    store = open_journal(tmp_path)
+    for story_id in range(1, count + 1):
+        store.add("Spooky" if story_id % 3 == 0 else "Funny", f"Story {story_id}.")
+    return StoryService(store)
+
+def post_story(service, data):
+    return service.handle("POST", "/story", {}, json.dumps(data).encode("utf-8"))
+
+def get_stories(service, query=""):
+    return service.handle("GET", "/stories", parse_qs(query), b"")
+
+def error_for(call, *args):
+    with pytest.raises(HTTPError) as error:
+        call(*args)
+    return error.value.status, str(error.value)
+
+def test_story_is_rendered_from_the_words():
+    status, payload = post_story(StoryService(), {"theme": "Spooky", "inputs": {**WORDS, "extra": "ignored"}})
+    assert status == 200
+    assert payload["theme"] == "Spooky" and payload["inputs"] == WORDS
+    assert payload["story"]
+
+@pytest.mark.parametrize("data, message", [
+    ({"theme": "Cheerful", "inputs": WORDS}, "Unknown theme: Cheerful"),
+    ({"theme": ["Funny"], "inputs": WORDS}, "Unknown theme"),
+    ({"inputs": ["cat"]}, "inputs must be an object"),
+    ({"inputs": {**WORDS, "noun": ""}}, "Missing words for: noun"),
+    ({"inputs": {field: WORDS[field] for field in list(WORDS)[1:]}}, "Missing words for: " + list(WORDS)[0]),
+    ({"inputs": {**WORDS, "noun": 3}}, "Words must be strings: noun"),
+    ({"inputs": WORDS, "save": "yes"}, "save must be true or false"),
+])
+def test_bad_story_requests(data, message):
+    status, error = error_for(post_story, StoryService(), data)
+    assert status == 400 and message in error
+
+def test_bad_json_bodies():
+    service = StoryService()
+    assert error_for(service.handle, "POST", "/story", {}, b"{not json")[0] == 400
+    assert error_for(service.handle, "POST", "/story", {}, b"\xff")[0] == 400
+    assert error_for(service.handle, "POST", "/story", {}, b"[1, 2]") == (400, "Body must be a JSON object")
+    assert error_for(post_story, service, {"inputs": WORDS, "save": True})[0] == 400
+
+def test_routing(tmp_path):
+    service = saved_service(tmp_path, 1)
+    assert error_for(service.handle, "GET", "/story", {}, b"")[0] == 405
+    assert error_for(service.handle, "POST", "/suggest/noun", {}, b"")[0] == 405
+    assert error_for(service.handle, "DELETE", "/stories", {}, b"")[0] == 405
+    assert error_for(service.handle, "GET", "/nowhere", {}, b"") == (404, "No such endpoint: /nowhere")
+    assert error_for(service.handle, "GET", "/suggest/colour", {}, b"")[0] == 404
+    assert error_for(StoryService().handle, "GET", "/stories", {}, b"")[0] == 404
+
+    status, payload = service.handle("GET", "/suggest/noun", {}, b"")
+    assert status == 200 and payload["field"] == "noun" and payload["suggestion"]
+
+@pytest.mark.parametrize("query", ["theme=Cheerful", "page=two", "page=0"])
+def test_bad_stories_queries(tmp_path, query):
+    assert error_for(get_stories, saved_service(tmp_path, 1), query)[0] == 400
+
+def test_paging_walks_to_deep_pages(tmp_path):
+    service = saved_service(tmp_path, 2 * PAGE_SIZE + 5)
+    funny = [story_id for story_id in range(2 * PAGE_SIZE + 5, 0, -1) if story_id % 3]
+
+    # Straight to the last Funny page: the pages before it are walked once and remembered
+    last = (len(funny) + PAGE_SIZE - 1) // PAGE_SIZE
+    status, payload = get_stories(service, f"theme=Funny&page={last}")
+    assert status == 200
+    assert [story["id"] for story in payload["stories"]] == funny[(last - 1) * PAGE_SIZE:]
+    assert payload["next_page"] is None
+    assert set(service.page_marks) == {("Funny", number) for number in range(1, last + 1)}
+
+    # Walk every page of all themes by following next_page
+    seen, page = [], 1
+    while page is not None:
+        payload = get_stories(service, f"page={page}")[1]
+        assert payload["page"] == page
+        seen += [story["id"] for story in payload["stories"]]
+        page = payload["next_page"]
+    assert seen == list(range(2 * PAGE_SIZE + 5, 0, -1))
+
+    # Past the end
+    payload = get_stories(service, "page=10")[1]
+    assert payload["stories"] == [] and payload["next_page"] is None
+
+def test_saves_start_the_pages_over(tmp_path):
+    service = saved_service(tmp_path, PAGE_SIZE + 1)
+    assert get_stories(service, "page=2")[1]["stories"][0]["id"] == 1
+
+    story_data = post_story(service, {"theme": "Funny", "inputs": WORDS, "save": True})[1]
+    assert story_data["id"] == PAGE_SIZE + 2 and service.page_marks == {}
+    assert [story["id"] for story in get_stories(service, "page=2")[1]["stories"]] == [2, 1]
+
+    # A save by another process sharing the journal is picked up too
+    open_journal(tmp_path).add("Funny", "From the app.")
+    payload = get_stories(service)[1]
+    assert payload["stories"][0]["story"] == "From the app."
+    assert [story["id"] for story in get_stories(service, "page=2")[1]["stories"]] == [3, 2, 1]
+
+def test_store_requests_run_on_the_store_thread(tmp_path):
+    service = saved_service(tmp_path, 3)
+    status, payload = asyncio.run(service.handle_async("GET", "/stories", {}, b""))
+    assert status == 200 and [story["id"] for story in payload["stories"]] == [3, 2, 1]
+    service.store_thread.shutdown()
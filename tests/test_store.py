@@ -0,0 +1,147 @@
+"""Round trips through the saved-story stores: damaged journals and old databases"""
+import json
+import sqlite3
+
+import pytest
+
+from storygen.sqlite_store import SQLiteStoryStore
+from storygen.store import StoryStore, text_hash
+from storygen.suggestions import random_inputs
+from storygen.templates import pick_template
+
+def open_journal(tmp_path, **options):
+    return StoryStore(str(tmp_path / "stories.jsonl"), str(tmp_path / "stories.json"), **options).load()
+
+def journal_lines(tmp_path):
+    with open(tmp_path / "stories.jsonl", "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def test_duplicate_texts_are_written_once(tmp_path):
+    store = open_journal(tmp_path)
+    store.add("Funny", "Same story.")
+    store.add("Spooky", "Same story.")
+
+    first, second = journal_lines(tmp_path)
+    assert first["hash"] == text_hash("Same story.") and first["story"] == "Same story."
+    assert second["ref"] == first["hash"] and "story" not in second
+    assert [story["story"] for story in open_journal(tmp_path)] == ["Same story.", "Same story."]
+
+def test_inputs_only_stories_render_again_on_load(tmp_path):
+    template = pick_template("Funny")
+    inputs = random_inputs()
+    story = template.render(inputs)
+    open_journal(tmp_path, inputs_only=True).add("Funny", story, inputs, template.id)
+
+    assert "story" not in journal_lines(tmp_path)[0]
+    assert open_journal(tmp_path).get(1)["story"] == story
+
+def test_damaged_lines_are_skipped_and_the_journal_rewritten(tmp_path):
+    good = {"id": 1, "timestamp": "2024-01-01 00:00:00", "theme": "Funny", "story": "Kept.", "hash": text_hash("Kept.")}
+    lost_text = {"id": 2, "timestamp": "2024-01-01 00:00:00", "theme": "Funny", "ref": "0" * 32}
+    partial = json.dumps({"id": 3, "timestamp": "2024-01-01 00:00:00", "theme": "Funny", "story": "Cut off"})[:30]
+    with open(tmp_path / "stories.jsonl", "w", encoding="utf-8") as f:
+        f.write(json.dumps(good) + "\n" + "not json\n" + json.dumps(lost_text) + "\n" + partial)
+
+    store = open_journal(tmp_path)
+    assert [story["story"] for story in store] == ["Kept."]
+
+    # The rewrite leaves whole lines only, so the next save isn't glued to the partial one
+    store.add("Spooky", "Added after.")
+    assert [line["id"] for line in journal_lines(tmp_path)] == [1, 2]
+    assert [story["story"] for story in open_journal(tmp_path)] == ["Kept.", "Added after."]
+
+def test_save_after_a_writer_crashed_mid_line(tmp_path):
+    store = open_journal(tmp_path)
+    store.add("Funny", "First.")
+    with open(tmp_path / "stories.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"id": 2, "theme": "Fun')
+
+    store.add("Funny", "Second.")
+    assert [story["story"] for story in open_journal(tmp_path)] == ["First.", "Second."]
+
+def test_stores_sharing_a_journal_get_their_own_ids(tmp_path):
+    app, server = open_journal(tmp_path), open_journal(tmp_path)
+    app.add("Funny", "From the app.")
+    server.add("Funny", "From the server.")
+    app.add("Funny", "From the app again.")
+
+    assert [(story["id"], story["story"]) for story in open_journal(tmp_path)] == [
+        (1, "From the app."), (2, "From the server."), (3, "From the app again."),
+    ]
+
+def test_read_only_load_leaves_the_files_alone(tmp_path):
+    legacy = [{"id": 1, "timestamp": "2024-01-01 00:00:00", "theme": "Funny", "story": "Old."}]
+    (tmp_path / "stories.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+    store = open_journal(tmp_path, read_only=True)
+    assert [story["story"] for story in store] == ["Old."]
+    assert not (tmp_path / "stories.jsonl").exists()
+
+def test_read_only_database_is_never_created(tmp_path):
+    path = tmp_path / "stories.db"
+    with pytest.raises(sqlite3.OperationalError):
+        SQLiteStoryStore(str(path), import_from=None, read_only=True).load()
+    assert not path.exists()
+
+    SQLiteStoryStore(str(path), import_from=None).load().add("Funny", "Saved.")
+    store = SQLiteStoryStore(str(path), read_only=True).load()
+    try:
+        assert [story["story"] for story in store] == ["Saved."]
+    finally:
+        store.close()
+
+def test_old_database_schema_is_upgraded(tmp_path):
+    path = str(tmp_path / "stories.db")
+    conn = sqlite3.connect(path)
+    # The first schema: each story's text in the stories table, and no inputs
+    conn.execute("CREATE TABLE stories (id INTEGER PRIMARY KEY, timestamp TEXT NOT NULL, theme TEXT NOT NULL, story TEXT NOT NULL)")
+    conn.executemany("INSERT INTO stories VALUES (?, ?, ?, ?)", [
+        (1, "2024-01-01 00:00:00", "Funny", "Same story."),
+        (2, "2024-01-01 00:00:01", "Spooky", "Same story."),
+        (3, "2024-01-01 00:00:02", "Funny", "Another story."),
+    ])
+    conn.commit()
+    conn.close()
+
+    store = SQLiteStoryStore(path, import_from=None).load()
+    try:
+        assert [story["story"] for story in store] == ["Same story.", "Same story.", "Another story."]
+        assert store.conn.execute("SELECT COUNT(*) FROM texts").fetchone()[0] == 2
+        columns = {row[1] for row in store.conn.execute("PRAGMA table_info(stories)")}
+        assert "story" not in columns and "inputs" in columns
+        assert [story["id"] for story in store.query("Funny")] == [3, 1]
+
+        story_data = store.add("Funny", "New story.", {"noun": "cat"})
+        assert story_data["id"] == 4
+        assert store.get(4)["inputs"] == {"noun": "cat"}
+    finally:
+        store.close()
+
+def test_sqlite_is_seeded_from_the_journal(tmp_path):
+    journal = open_journal(tmp_path)
+    journal.add("Funny", "One.")
+    journal.add("Spooky", "Two.")
+
+    store = SQLiteStoryStore(str(tmp_path / "stories.db"), import_from=journal.path).load()
+    try:
+        assert [(story["id"], story["story"]) for story in store] == [(1, "One."), (2, "Two.")]
+        assert store.add("Funny", "Three.")["id"] == 3
+    finally:
+        store.close()
+
+def test_legacy_ids_are_sorted_and_duplicates_renumbered(tmp_path):
+    legacy = [
+        {"id": 3, "timestamp": "2024-01-01 00:00:03", "theme": "Funny", "story": "Three."},
+        {"id": 1, "timestamp": "2024-01-01 00:00:01", "theme": "Funny", "story": "One."},
+        {"id": 3, "timestamp": "2024-01-01 00:00:04", "theme": "Spooky", "story": "Copied three."},
+        {"timestamp": "2024-01-01 00:00:05", "theme": "Funny", "story": "No id."},
+        {"id": 2, "timestamp": "2024-01-01 00:00:02", "theme": "Funny", "story": "Two."},
+    ]
+    (tmp_path / "stories.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+    expected = [(1, "One."), (2, "Two."), (3, "Three."), (4, "Copied three."), (5, "No id.")]
+    store = open_journal(tmp_path)
+    assert [(story["id"], story["story"]) for story in store] == expected
+    assert store.get(2)["story"] == "Two." and store.get(4)["story"] == "Copied three."
+    assert store.add("Funny", "Six.")["id"] == 6
+    assert [(story["id"], story["story"]) for story in open_journal(tmp_path)] == expected + [(6, "Six.")]
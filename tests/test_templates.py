@@ -0,0 +1,95 @@
+"""Template packs: validation and the compiled-pack cache"""
+import json
+import os
+
+import pytest
+
+from storygen import templates
+from storygen.templates import TemplateLibrary, TemplatePackError, compile_pack
+
+BUILTIN = {"Funny": [], "Spooky": [], "Sci-Fi": [], "Romantic": []}
+
+def pack_text(templates):
+    return json.dumps({"templates": templates})
+
+@pytest.mark.parametrize("text, message", [
+    ("{not json", "can't parse"),
+    (json.dumps({"stories": {}}), "no [templates] table"),
+    (pack_text({"Cheerful": ["A {noun}."]}), "unknown theme 'Cheerful'"),
+    (pack_text({"Funny": "A {noun}."}), "must be a list of strings"),
+    (pack_text({"Funny": ["A {noun}.", 3]}), "must be a list of strings"),
+    (pack_text({"Funny": ["A {noun}.", "A {colour}."]}), "Funny template 2 uses unknown slot(s) colour"),
+    (pack_text({"Funny": ["A {noun.reverse()}."]}), "Funny template 1"),
+])
+def test_malformed_packs_are_rejected(text, message):
+    with pytest.raises(TemplatePackError) as error:
+        compile_pack("packs/bad.json", text)
+    assert "packs/bad.json" in str(error.value)
+    assert message in str(error.value)
+
+def test_pack_templates_render():
+    compiled = compile_pack("good.json", pack_text({"Funny": ["  A {adjective} {noun.upper()} in {place}.  "]}))
+    assert compiled["Funny"][0].render({"adjective": "tiny", "noun": "cat", "place": "Paris"}) == "A tiny CAT in Paris."
+
+def write_pack(path, templates, mtime_ns):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(pack_text(templates))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+def stories(library):
+    return [template.render({"noun": "cat"}) for template in library.templates["Funny"]]
+
+def test_bad_pack_is_skipped_and_the_rest_loaded(tmp_path):
+    (tmp_path / "packs").mkdir()
+    write_pack(tmp_path / "packs" / "good.json", {"Funny": ["Good {noun}."]}, 1_000_000_000)
+    (tmp_path / "packs" / "bad.json").write_text("{not json", encoding="utf-8")
+
+    library = TemplateLibrary(BUILTIN, str(tmp_path / "packs"), str(tmp_path / "cache"))
+    library.reload()
+    assert stories(library) == ["Good cat."]
+
+def test_cache_is_used_until_the_pack_changes(tmp_path, monkeypatch):
+    compiled = []
+    def counted_compile(path, text):
+        compiled.append(text)
+        return compile_pack(path, text)
+    monkeypatch.setattr(templates, "compile_pack", counted_compile)
+
+    packs, cache = tmp_path / "packs", tmp_path / "cache"
+    packs.mkdir()
+    path = packs / "pack.json"
+    write_pack(path, {"Funny": ["One {noun}."]}, 1_000_000_000)
+    TemplateLibrary(BUILTIN, str(packs), str(cache)).reload()
+    with open(cache / "index.json", "r", encoding="utf-8") as f:
+        index = json.load(f)
+    assert index[str(path)]["signature"] == [1_000_000_000, path.stat().st_size]
+    assert len(compiled) == 1
+
+    # A fresh library with an unchanged pack loads the cached form
+    library = TemplateLibrary(BUILTIN, str(packs), str(cache))
+    library.reload()
+    assert stories(library) == ["One cat."]
+    assert len(compiled) == 1
+
+    # Same size, new modification time: compiled again
+    write_pack(path, {"Funny": ["Two {noun}."]}, 2_000_000_000)
+    library = TemplateLibrary(BUILTIN, str(packs), str(cache))
+    library.reload()
+    assert stories(library) == ["Two cat."]
+    assert len(compiled) == 2
+
+    # Same modification time, new size: compiled again, in a library that already had it loaded
+    write_pack(path, {"Funny": ["Three {noun}s."]}, 2_000_000_000)
+    library.reload()
+    assert stories(library) == ["Three cats."]
+    assert len(compiled) == 3
+
+def test_removed_pack_is_dropped(tmp_path):
+    packs = tmp_path / "packs"
+    packs.mkdir()
+    write_pack(packs / "pack.json", {"Funny": ["One {noun}."]}, 1_000_000_000)
+    library = TemplateLibrary(BUILTIN, str(packs), str(tmp_path / "cache"))
+    library.reload()
+    os.remove(packs / "pack.json")
+    library.reload()
+    assert stories(library) == []
@@ -0,0 +1,39 @@
+"""Word banks: built from word lists and read back through mmap"""
+import random
+
+from storygen.wordbank import WordBank, WordBanks, build_banks, write_bank
+
+def test_built_banks_read_back_the_same_words(tmp_path):
+    source, out = tmp_path / "lists", tmp_path / "banks"
+    source.mkdir()
+    nouns = [f"noun{i}" for i in range(1000)] + ["café", "naïve", "日本", "🐈"]
+    (source / "noun.txt").write_text("\n".join(["", "  cat  ", *nouns, "noun1", ""]), encoding="utf-8")
+    (source / "place.txt").write_text("Paris\nRome\n", encoding="utf-8")
+
+    written = build_banks(str(source), ["noun", "place", "verb"], {"noun": ["dog", "cat"]}, str(out))
+    assert written == {"noun": len(nouns) + 2, "place": 2}
+
+    banks = WordBanks(str(out))
+    # Built-in words first, then the list; blanks and repeats dropped
+    assert list(banks.get("noun")) == ["dog", "cat", *nouns]
+    assert list(banks.get("place")) == ["Paris", "Rome"]
+    assert banks.get("verb") is None
+
+    rng = random.Random(1)
+    assert all(banks.get("place").sample(rng) in ("Paris", "Rome") for _ in range(20))
+
+def test_damaged_banks_are_ignored(tmp_path):
+    path = str(tmp_path / "noun.bank")
+    write_bank(["one", "two", "three"], path)
+    with open(path, "rb") as f:
+        data = f.read()
+    with open(path, "wb") as f:
+        f.write(data[:-2])
+    assert WordBanks(str(tmp_path)).get("noun") is None
+
+    (tmp_path / "verb.bank").write_bytes(b"not a word bank at all")
+    assert WordBanks(str(tmp_path)).get("verb") is None
+
+    write_bank(["one"], path)
+    bank = WordBank(path)
+    assert len(bank) == 1 and bank[0] == "one"